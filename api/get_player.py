@@ -1,40 +1,43 @@
-import requests
-from toolz import pipe, concat
+import argparse
+import hashlib
+import json
+import logging
+import sys
+import time
+
+from toolz import pipe, concat, count
 
 # Assuming you have PlayerSeason and repository functions ready
+from api.season_fetcher import iter_season_pages
+from config.api_config import FETCH_CONCURRENCY, DEFAULT_SEASONS, INGEST_BATCH_SIZE, NBA_API_URL
 from models.playerSeason import PlayerSeason
-from repository.player_repository import insert_new_player
-from repository.player_season_repository import insert_player_season
-
+from repository.aggregate_repository import refresh_aggregates_for_players, refresh_all_aggregates
+from repository.checkpoint_repository import get_checkpoints, save_checkpoint
+from repository.data_version_repository import bump_data_version
+from repository.database import unit_of_work
+from repository.player_repository import insert_new_player, insert_players_bulk
+from repository.player_season_repository import insert_player_season, insert_player_seasons_bulk, \
+    upsert_player_seasons_bulk, get_team_seasons
+from service.data_version import reset_data_version
+from service.monitoring import record_ingested_page, record_ingest_run
 
-def create_player_season(player_data, player_id):
-    return PlayerSeason(
-        player_id=player_id,
-        position=player_data.get('position', ''),
-        season=player_data.get("season", ""),
-        team=player_data.get("team", ""),
-        points=player_data.get("points", 0),
-        games=player_data.get("games", 0),
-        twoPercent=player_data.get("twoPercent", 0.0),
-        threePercent=player_data.get("threePercent", 0.0),
-        ATR=player_data.get("ATR", 0.0),
-        PPG_ratio=player_data.get("PPG_ratio", 0.0),
-        assists=player_data.get('assists', 0.0),
-        turnovers=player_data.get('turnovers', 0.0)
+logger = logging.getLogger(__name__)
 
 
-    )
+def create_player_season(player_data, player_id):
+    return PlayerSeason.from_api(player_data, player_id)
 
 
-def fetch_players_by_season(season):
-    nba_url = f'http://b8c40s8.143.198.70.30.sslip.io/api/PlayerDataTotals/query?season={season}&pageSize=100'
-    try:
-        response = requests.get(nba_url)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        print(f"Error fetching data for season {season}: {e}")
-        return []
+# Walks every page of the season. As before, a fetch error does not raise: the fetcher logs each
+# page that failed every retry, and the rows fetched up to it are returned.
+def fetch_players_by_season(season, base_url=NBA_API_URL):
+    failed_pages = []
+    players = list(concat(rows for _, _, rows in iter_season_pages([season], base_url=base_url,
+                                                                   failed_pages=failed_pages)))
+    if failed_pages:
+        logger.warning("Season %s is incomplete, pages %s failed", season,
+                       ', '.join(str(page_number) for _, page_number in failed_pages))
+    return players
 
 
 
@@ -48,15 +51,149 @@ def process_player(player):
     insert_player_season(player_season)
 
 
-def get_players_for_all_seasons():
-    all_seasons = [2022, 2023, 2024]
-    return pipe(
-        all_seasons,
+# Row-by-row ingestion; returns the number of rows processed
+def get_players_for_all_seasons(seasons=DEFAULT_SEASONS):
+    processed = pipe(
+        seasons,
         lambda seasons: map(fetch_players_by_season, seasons),
         concat,
         lambda players: map(lambda player: process_player(player), players),
-        list
+        count
     )
-
-
-print(get_players_for_all_seasons())
+    with unit_of_work():
+        refresh_all_aggregates()
+        bump_data_version()
+    reset_data_version()
+    return processed
+
+
+# ------------------------------------------------------------
+# ------------------ bulk ingestion ----------------------
+# ------------------------------------------------------------
+
+# Upserts a whole season's payload with a handful of set-based statements in one transaction.
+# In incremental mode existing rows whose stats changed are updated instead of skipped.
+def process_season_bulk(season, players, batch_size=INGEST_BATCH_SIZE, incremental=False):
+    players = [player for player in players if player.get('playerName')]
+
+    with unit_of_work():
+        player_ids = insert_players_bulk((player['playerName'] for player in players), page_size=batch_size)
+        player_seasons = [create_player_season(player, player_ids[player['playerName']]) for player in players]
+        # Groups the rows leave when an update moves a player to another team
+        previous_team_seasons = get_team_seasons(player_ids.values(), [season])
+        if incremental:
+            inserted, updated = upsert_player_seasons_bulk(player_seasons, page_size=batch_size)
+        else:
+            inserted, updated = insert_player_seasons_bulk(player_seasons, page_size=batch_size), 0
+        # Keep the aggregate tables and the data version in step with the rows just written
+        if inserted or updated:
+            team_seasons = previous_team_seasons | {(player_season.team, season) for player_season in player_seasons}
+            refresh_aggregates_for_players(player_ids.values(), team_seasons)
+            bump_data_version()
+
+    return {"season": season, "inserted": inserted, "updated": updated,
+            "skipped": len(player_seasons) - inserted - updated}
+
+
+def page_content_hash(players):
+    return hashlib.sha256(json.dumps(players, sort_keys=True).encode()).hexdigest()
+
+
+# Skips pages whose content is unchanged since the last run; the checkpoint is saved in the
+# same transaction as the rows so a failed run is simply retried next time
+def process_page_incremental(season, page_number, players, checkpoints, batch_size=INGEST_BATCH_SIZE):
+    content_hash = page_content_hash(players)
+    if checkpoints.get((season, page_number)) == content_hash:
+        return {"season": season, "inserted": 0, "updated": 0, "skipped": len(players), "pages_skipped": 1}
+
+    with unit_of_work():
+        page_result = process_season_bulk(season, players, batch_size, incremental=True)
+        save_checkpoint(season, page_number, content_hash)
+
+    return {**page_result, "pages_skipped": 0}
+
+
+def print_progress(season, page_number, page_result):
+    print(f"season {season} page {page_number}: "
+          f"{page_result['inserted']} inserted, {page_result['updated']} updated, "
+          f"{page_result['skipped']} skipped" + (" (unchanged page)" if page_result['pages_skipped'] else ""),
+          flush=True)
+
+
+# Library entry point. Pages are written as soon as they arrive while the remaining pages are
+# still being fetched; `progress` is called once per page. Returns per-season and total counts.
+def ingest(seasons=DEFAULT_SEASONS, concurrency=FETCH_CONCURRENCY, batch_size=INGEST_BATCH_SIZE,
+           incremental=False, dry_run=False, progress=None, base_url=NBA_API_URL):
+    started = time.monotonic()
+    seasons = list(seasons)
+    summary = {
+        season: {"season": season, "pages": 0, "fetched": 0, "inserted": 0, "updated": 0, "skipped": 0,
+                 "pages_skipped": 0, "failed_pages": [], "complete": True}
+        for season in seasons
+    }
+    checkpoints = get_checkpoints(seasons) if incremental and not dry_run else {}
+    failed_pages = []
+
+    for season, page_number, players in iter_season_pages(seasons, concurrency=concurrency, base_url=base_url,
+                                                          failed_pages=failed_pages):
+        if dry_run:
+            page_result = {"inserted": 0, "updated": 0, "skipped": 0, "pages_skipped": 0}
+        elif incremental:
+            page_result = process_page_incremental(season, page_number, players, checkpoints, batch_size)
+        else:
+            page_result = {"updated": 0, "pages_skipped": 0, **process_season_bulk(season, players, batch_size)}
+
+        season_summary = summary[season]
+        season_summary["pages"] += 1
+        season_summary["fetched"] += len(players)
+        for key in ("inserted", "updated", "skipped", "pages_skipped"):
+            season_summary[key] += page_result[key]
+        if not dry_run:
+            record_ingested_page(page_result)
+
+        if progress:
+            progress(season, page_number, page_result)
+
+    # A season with a failed page is incomplete: its later pages were not fetched
+    for season, page_number in failed_pages:
+        summary[season]["failed_pages"].append(page_number)
+        summary[season]["complete"] = False
+
+    if not dry_run:
+        reset_data_version()
+
+    totals = {
+        key: sum(season_summary[key] for season_summary in summary.values())
+        for key in ("pages", "fetched", "inserted", "updated", "skipped", "pages_skipped")
+    }
+    totals["failed_pages"] = len(failed_pages)
+    elapsed = time.monotonic() - started
+    if not dry_run:
+        record_ingest_run(totals["fetched"], elapsed)
+    return {"seasons": list(summary.values()), **totals, "elapsed": elapsed}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch NBA player seasons and load them into the database")
+    parser.add_argument('--seasons', type=int, nargs='+', default=DEFAULT_SEASONS)
+    parser.add_argument('--concurrency', type=int, default=FETCH_CONCURRENCY,
+                        help="maximum number of API requests in flight")
+    parser.add_argument('--batch-size', type=int, default=INGEST_BATCH_SIZE,
+                        help="rows per INSERT statement")
+    parser.add_argument('--incremental', action='store_true',
+                        help="skip unchanged pages and update changed rows")
+    parser.add_argument('--dry-run', action='store_true', help="fetch everything but write nothing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = ingest(args.seasons, concurrency=args.concurrency, batch_size=args.batch_size,
+                     incremental=args.incremental, dry_run=args.dry_run, progress=print_progress)
+    print(json.dumps(summary, indent=2))
+    if summary["failed_pages"]:
+        sys.exit(f"{summary['failed_pages']} page(s) failed; the seasons marked incomplete must be ingested again")
+
+
+if __name__ == '__main__':
+    main()
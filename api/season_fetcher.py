@@ -0,0 +1,134 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+
+from config.api_config import NBA_API_URL, PAGE_SIZE, FETCH_CONCURRENCY, FETCH_TIMEOUT, FETCH_MAX_RETRIES, \
+    FETCH_BACKOFF_BASE
+from service.monitoring import record_fetch
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# One HTTP session (and its keep-alive connections) per worker thread
+_sessions = threading.local()
+
+_stats_lock = threading.Lock()
+_stats = {'pages_fetched': 0, 'rows_fetched': 0, 'retries': 0, 'failed_pages': 0}
+
+
+def _count(**increments):
+    with _stats_lock:
+        for key, value in increments.items():
+            _stats[key] += value
+    record_fetch(**increments)
+
+
+def get_fetch_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def get_session():
+    session = getattr(_sessions, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _sessions.session = session
+    return session
+
+
+def backoff_delay(attempt, base=FETCH_BACKOFF_BASE):
+    # "Full jitter": a random delay between 0 and the exponential cap
+    return random.uniform(0, base * (2 ** attempt))
+
+
+def fetch_page(season, page_number, page_size=PAGE_SIZE, base_url=NBA_API_URL, max_retries=FETCH_MAX_RETRIES,
+               backoff_base=FETCH_BACKOFF_BASE, timeout=FETCH_TIMEOUT):
+    params = {'season': season, 'pageSize': page_size, 'pageNumber': page_number}
+
+    for attempt in range(max_retries + 1):
+        try:
+            response = get_session().get(base_url, params=params, timeout=timeout)
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                response.raise_for_status()
+                rows = response.json()
+                _count(pages_fetched=1, rows_fetched=len(rows))
+                return rows
+            error = requests.HTTPError(f"{response.status_code} response", response=response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+
+        if attempt == max_retries:
+            raise error
+        _count(retries=1)
+        time.sleep(backoff_delay(attempt, backoff_base))
+
+
+# Yields (season, page_number, rows) as pages complete. Pages of every season are requested
+# concurrently, at most `concurrency` at a time; a season ends at its first short page.
+# A page that fails every retry does not end its season: no further pages of that season are
+# requested, the ones in flight are still yielded, and the failure is reported. `failed_pages`,
+# when given, collects (season, page_number) of those pages; otherwise the first error is
+# raised once every other page has been yielded.
+def iter_season_pages(seasons, concurrency=FETCH_CONCURRENCY, page_size=PAGE_SIZE, base_url=NBA_API_URL,
+                      max_retries=FETCH_MAX_RETRIES, backoff_base=FETCH_BACKOFF_BASE, failed_pages=None):
+    seasons = list(seasons)
+    next_page = {season: 1 for season in seasons}
+    last_page = {}
+    failures = []
+    failed_seasons = set()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+
+        def schedule(season):
+            page_number = next_page[season]
+            next_page[season] += 1
+            future = executor.submit(fetch_page, season, page_number, page_size, base_url, max_retries,
+                                     backoff_base)
+            pending[future] = (season, page_number)
+
+        # Keep `concurrency` pages in flight, always extending the season that is furthest behind
+        def fill_slots():
+            while len(pending) < concurrency:
+                unfinished = [season for season in seasons if season not in last_page and season not in failed_seasons]
+                if not unfinished:
+                    return
+                schedule(min(unfinished, key=lambda season: next_page[season]))
+
+        fill_slots()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                season, page_number = pending.pop(future)
+                if page_number > last_page.get(season, page_number):
+                    # Past the end of the season, fetched speculatively
+                    continue
+
+                try:
+                    rows = future.result()
+                except requests.RequestException as e:
+                    logger.error("Page %d of season %s failed after %d retries: %s",
+                                 page_number, season, max_retries, e)
+                    _count(failed_pages=1)
+                    failures.append((season, page_number, e))
+                    failed_seasons.add(season)
+                    continue
+
+                if len(rows) < page_size:
+                    last_page[season] = page_number
+                if rows:
+                    yield season, page_number, rows
+
+            fill_slots()
+
+    # A failed page past its season's end (found later) lost nothing
+    failures = [failure for failure in failures if failure[1] <= last_page.get(failure[0], failure[1])]
+    if failed_pages is not None:
+        failed_pages.extend((season, page_number) for season, page_number, _ in failures)
+    elif failures:
+        raise failures[0][2]
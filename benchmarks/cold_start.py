@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+FIRST_REQUEST = '/api/players?position=PG'
+
+
+def timed_get(client, url):
+    start = time.perf_counter()
+    response = client.get(url)
+    response.get_data()
+    assert response.status_code == 200, (url, response.status_code)
+    return time.perf_counter() - start
+
+
+# Runs in a fresh interpreter: seconds to import and create the app, to warm it up and to serve
+# the first and second request
+def measure_child(warm):
+    start = time.perf_counter()
+    from main import create_app, warm_up
+    app = create_app()
+    created = time.perf_counter()
+    if warm:
+        warm_up(app)
+    ready = time.perf_counter()
+
+    client = app.test_client()
+    return {
+        "create_app": created - start,
+        "warm_up": ready - created,
+        "first_request": timed_get(client, FIRST_REQUEST),
+        "second_request": timed_get(client, FIRST_REQUEST),
+    }
+
+
+def run_child(warm):
+    command = [sys.executable, '-m', 'benchmarks.cold_start', '--child'] + (['--warm-up'] if warm else [])
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+# Median of each phase over `runs` fresh processes, with and without warm-up
+def run(runs):
+    results = {}
+    for warm in (False, True):
+        samples = [run_child(warm) for _ in range(runs)]
+        results['warm-up' if warm else 'cold'] = {
+            phase: statistics.median(sample[phase] for sample in samples) for phase in samples[0]
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Cold start to first request latency, with and without warm-up. "
+                    "Every table of the target database is dropped and recreated.")
+    parser.add_argument('--size', type=lambda text: [int(part) for part in text.split('x')], default=[2000, 5, 100],
+                        metavar='PLAYERSxSEASONSxTEAMS')
+    parser.add_argument('--runs', type=int, default=5, help="processes started per mode")
+    parser.add_argument('--embedded', metavar='DIR',
+                        help="run against an embedded PostgreSQL kept in DIR (requires pgserver)")
+    parser.add_argument('--yes', action='store_true', help="allow dropping the tables of DATABASE_URL")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--warm-up', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure_child(args.warm_up)))
+        return
+
+    if args.embedded:
+        import pgserver
+        os.environ['DATABASE_URL'] = pgserver.get_server(args.embedded).get_uri()
+    elif not args.yes:
+        parser.error("this drops every table of DATABASE_URL; pass --yes or use --embedded DIR")
+
+    # Imported once DATABASE_URL is final, since the configuration is read at import time
+    from benchmarks.league import League
+    from benchmarks.suite import load_league
+    from repository.database import create_tables, drop_all_tables
+
+    drop_all_tables()
+    create_tables()
+    try:
+        load_league(League(*args.size), batch_size=1000)
+        results = run(args.runs)
+    finally:
+        drop_all_tables()
+
+    print(f"{'mode':<10}" + ''.join(f"{phase:>16}" for phase in results['cold']) + "  (ms, median)")
+    for mode, phases in results.items():
+        print(f"{mode:<10}" + ''.join(f"{seconds * 1000:>16.1f}" for seconds in phases.values()))
+
+
+if __name__ == '__main__':
+    main()
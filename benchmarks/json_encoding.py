@@ -0,0 +1,74 @@
+import argparse
+import time
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from controller.compression import ENCODINGS, compress
+from controller.json_provider import FastJSONProvider
+
+
+# A full-position GET /api/players body: one row per player season, as built by to_player_stats
+def player_rows(count):
+    return [
+        {"playerName": f"Player {i}", "team": "LAL", "season": 2000 + i % 25, "points": 1000 + i, "games": 82,
+         "twoPercent": 0.512, "threePercent": 0.371, "ATR": 1.8 + i / count, "PPG": 12.2 + i / count}
+        for i in range(count)
+    ]
+
+
+# The same rows with the NUMERIC aggregates PostgreSQL returns as Decimal (career totals, team stats)
+def decimal_rows(count):
+    return [
+        {**row, "twoPercent": Decimal("0.512"), "threePercent": Decimal("0.371"), "ATR": Decimal("1.8")}
+        for row in player_rows(count)
+    ]
+
+
+def best_of(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+# Seconds (best of `repeat`) and body bytes of a JSON response, per provider and payload
+def run(rows=20_000, repeat=5):
+    payloads = {'player stats': player_rows(rows), 'with Decimal': decimal_rows(rows)}
+    providers = {'default': DefaultJSONProvider, 'fast': FastJSONProvider}
+
+    results = {}
+    for provider_name, provider in providers.items():
+        app = Flask(__name__)
+        app.json = provider(app)
+        with app.app_context():
+            for payload_name, payload in payloads.items():
+                elapsed, response = best_of(lambda: app.json.response(payload), repeat)
+                results[f'{provider_name} json, {payload_name}'] = (elapsed, len(response.get_data()))
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    with app.app_context():
+        body = app.json.response(payloads['player stats']).get_data()
+    for encoding in ENCODINGS:
+        elapsed, encoded = best_of(lambda: compress(body, encoding), repeat)
+        results[f'{encoding}, player stats'] = (elapsed, len(encoded))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON encoding and compression of a full-position response")
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<34}{'ms':>10}{'KB':>10}  (per {args.rows} rows)")
+    for name, (elapsed, size) in run(args.rows, args.repeat).items():
+        print(f"{name:<34}{elapsed * 1000:>10.1f}{size / 1e3:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
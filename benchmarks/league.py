@@ -0,0 +1,63 @@
+import random
+
+POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C']
+NBA_TEAMS = ['ATL', 'BOS', 'BRK', 'CHI', 'CHO', 'CLE', 'DAL', 'DEN', 'DET', 'GSW', 'HOU', 'IND', 'LAC', 'LAL', 'MEM',
+             'MIA', 'MIL', 'MIN', 'NOP', 'NYK', 'OKC', 'ORL', 'PHI', 'PHO', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS']
+
+
+# A synthetic league: `players` players, each playing every one of `seasons` seasons (ending at
+# `last_season`), and `teams` fantasy teams of one player per position. Deterministic for a seed.
+class League:
+    def __init__(self, players, seasons, teams, seed=0, last_season=2024):
+        self.players = players
+        self.seasons = list(range(last_season - seasons + 1, last_season + 1))
+        self.teams = teams
+        self.seed = seed
+
+    @property
+    def name(self):
+        return f"{self.players}x{len(self.seasons)}x{self.teams}"
+
+    @property
+    def rows(self):
+        return self.players * len(self.seasons)
+
+    # Rows shaped like the NBA stats API payload, keyed by season
+    def api_rows(self):
+        generator = random.Random(self.seed)
+        seasons = {season: [] for season in self.seasons}
+        for player in range(self.players):
+            # Positions are spread evenly so every fantasy team can be filled
+            position = POSITIONS[player % len(POSITIONS)]
+            team = generator.choice(NBA_TEAMS)
+            for season in self.seasons:
+                if generator.random() < 0.2:
+                    team = generator.choice(NBA_TEAMS)
+                games = generator.randint(0, 82)
+                assists = float(generator.randint(0, 700))
+                turnovers = float(generator.randint(0, 300))
+                seasons[season].append({
+                    'playerName': f'Synthetic Player {player}',
+                    'position': position,
+                    'season': season,
+                    'team': team,
+                    'points': generator.randint(0, 30) * games,
+                    'games': games,
+                    'twoPercent': round(generator.uniform(0.3, 0.65), 3) if games else None,
+                    'threePercent': round(generator.uniform(0.2, 0.45), 3) if games else None,
+                    'ATR': 0.0,
+                    'PPG_ratio': 0.0,
+                    'assists': assists,
+                    'turnovers': turnovers,
+                })
+        return seasons
+
+    # Player IDs of each fantasy team, one player per position, no player in two teams.
+    # `player_ids` maps player names to database IDs.
+    def team_rosters(self, player_ids):
+        by_position = {position: [] for position in POSITIONS}
+        for player in range(self.players):
+            by_position[POSITIONS[player % len(POSITIONS)]].append(player_ids[f'Synthetic Player {player}'])
+
+        teams = min(self.teams, min(len(ids) for ids in by_position.values()))
+        return [[by_position[position][team] for position in POSITIONS] for team in range(teams)]
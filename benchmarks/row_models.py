@@ -0,0 +1,99 @@
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from models.playerSeason import PlayerSeason
+
+
+# The row model as it was before it became tuple-backed, built the way create_player_season used to build it
+@dataclass
+class LegacyPlayerSeason:
+    player_id: int
+    position: str
+    season: int
+    team: str
+    points: int
+    games: int
+    twoPercent: float
+    threePercent: float
+    ATR: float
+    PPG_ratio: float
+    assists: float
+    turnovers: float
+
+
+def legacy_from_api(player_data, player_id):
+    return LegacyPlayerSeason(
+        player_id=player_id,
+        position=player_data.get('position', ''),
+        season=player_data.get("season", ""),
+        team=player_data.get("team", ""),
+        points=player_data.get("points", 0),
+        games=player_data.get("games", 0),
+        twoPercent=player_data.get("twoPercent", 0.0),
+        threePercent=player_data.get("threePercent", 0.0),
+        ATR=player_data.get("ATR", 0.0),
+        PPG_ratio=player_data.get("PPG_ratio", 0.0),
+        assists=player_data.get('assists', 0.0),
+        turnovers=player_data.get('turnovers', 0.0)
+    )
+
+
+def api_rows(count):
+    return [
+        {'playerName': f'Player {i}', 'position': 'PG', 'season': 2024, 'team': 'LAL', 'points': i,
+         'games': 82, 'twoPercent': 0.5, 'threePercent': 0.35, 'ATR': 1.5, 'PPG_ratio': 12.0,
+         'assists': 300.0, 'turnovers': 200.0}
+        for i in range(count)
+    ]
+
+
+def db_rows(count):
+    return [(i, 'PG', 2024, 'LAL', i, 82, 0.5, 0.35, 1.5, 12.0, 300.0, 200.0) for i in range(count)]
+
+
+# Seconds to build the objects (best of `repeat`, untraced), and bytes they keep alive
+def measure(build, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return min(timings), retained
+
+
+def run(rows=100_000):
+    api = api_rows(rows)
+    tuples = db_rows(rows)
+    cases = {
+        'dataclass from API (before)': lambda: [legacy_from_api(row, i) for i, row in enumerate(api)],
+        'tuple-backed from API': lambda: [PlayerSeason.from_api(row, i) for i, row in enumerate(api)],
+        'dataclass from DB tuple (before)': lambda: [LegacyPlayerSeason(*row) for row in tuples],
+        'tuple-backed from DB tuple': lambda: [PlayerSeason.from_row(row) for row in tuples],
+        'dict per DB row': lambda: [dict(zip(LegacyPlayerSeason.__annotations__, row)) for row in tuples],
+    }
+    return {name: measure(build) for name, build in cases.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and memory of the row models")
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<34}{'ms':>10}{'MB':>10}  (per {args.rows} rows)")
+    for name, (elapsed, retained) in run(args.rows).items():
+        print(f"{name:<34}{elapsed * 1000:>10.1f}{retained / 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
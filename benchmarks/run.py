@@ -0,0 +1,87 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+
+DEFAULT_SIZES = ['500x3x20', '2000x5x100']
+
+
+def parse_size(text):
+    try:
+        players, seasons, teams = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected PLAYERSxSEASONSxTEAMS, got {text!r}")
+    if players < 10 or seasons < 1 or teams < 2:
+        raise argparse.ArgumentTypeError("a league needs at least 10 players, 1 season and 2 teams")
+    return players, seasons, teams
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(results):
+    for size in results:
+        ingestion = size['ingestion']
+        print(f"\n{size['league']} ({size['rows']} rows, {size['teams']} teams)"
+              f"{' with snapshot' if size['snapshot'] else ''}")
+        print(f"  ingest {ingestion['ingest_rows_per_second']:,.0f} rows/s, "
+              f"re-ingest {ingestion['reingest_rows_per_second']:,.0f} rows/s")
+        for layer, cases in size['cases'].items():
+            for name, timing in cases.items():
+                print(f"  {layer:<11}{name:<36}{timing['median'] * 1000:>9.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the repository, service and endpoint layers on synthetic leagues. "
+                    "Every table of the target database is dropped and recreated.")
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[parse_size(s) for s in DEFAULT_SIZES],
+                        metavar='PLAYERSxSEASONSxTEAMS')
+    parser.add_argument('--repeat', type=int, default=5, help="timed calls per case")
+    parser.add_argument('--batch-size', type=int, default=1000, help="ingestion batch size")
+    parser.add_argument('--snapshot', action='store_true', help="serve reads from the in-memory stats snapshot")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument('--embedded', metavar='DIR',
+                        help="run against an embedded PostgreSQL kept in DIR (requires pgserver)")
+    parser.add_argument('--yes', action='store_true', help="allow dropping the tables of DATABASE_URL")
+    args = parser.parse_args(argv)
+
+    if args.embedded:
+        import pgserver
+        os.environ['DATABASE_URL'] = pgserver.get_server(args.embedded).get_uri()
+    elif not args.yes:
+        parser.error("this drops every table of DATABASE_URL; pass --yes or use --embedded DIR")
+
+    # Imported once DATABASE_URL is final, since the configuration is read at import time
+    from benchmarks.suite import run
+    results = run(args.sizes, args.repeat, args.batch_size, args.snapshot, args.seed)
+
+    commit = current_commit()
+    created_at = datetime.datetime.now(datetime.timezone.utc)
+    output = args.output or os.path.join(
+        'benchmarks', 'results', f"{created_at:%Y%m%dT%H%M%S}-{(commit or 'unknown')[:8]}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump({
+            "commit": commit,
+            "created_at": created_at.isoformat(),
+            "python": platform.python_version(),
+            "database": "embedded" if args.embedded else "external",
+            "repeat": args.repeat,
+            "sizes": results,
+        }, file, indent=2)
+
+    print_summary(results)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+import statistics
+import time
+
+from flask import Flask
+
+from api.get_player import process_season_bulk
+from benchmarks.league import League
+from controller.debug_controller import init_query_instrumentation
+from controller.json_provider import FastJSONProvider
+from controller.players_controller import players_blueprint
+from controller.team_controller import teams_blueprint
+from repository.async_database import ASYNC_AVAILABLE, configure_async_queries, close_async_pool
+from repository.database import create_tables, drop_all_tables
+from repository.player_repository import insert_players_bulk
+from repository.player_season_repository import get_player_by_position, get_latest_positions, \
+    get_all_player_seasons
+from repository.team_repository import get_team_write_context
+from service.cache import configure_cache
+from service.player_season_service import main_calc, get_players_page
+from service.stats_snapshot import load_snapshot, clear_snapshot
+from service.team_service import main_create_team, get_team_details, compare_teams_with_missing, \
+    get_team_stats_by_name, get_teams_stats_by_name
+
+COMPARED_TEAMS = 10
+COMPARED_NAMES = ['LAL', 'BOS', 'NYK']
+
+
+def create_benchmark_app():
+    # Same JSON provider, blueprints and prefixes as main.create_app, with query instrumentation on
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.register_blueprint(blueprint=players_blueprint, url_prefix='/api')
+    app.register_blueprint(blueprint=teams_blueprint, url_prefix='/api')
+    init_query_instrumentation(app)
+    return app
+
+
+# min / median / max seconds of `repeat` calls; `before` runs untimed before each call
+def time_case(function, repeat, before=None):
+    timings = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings), "max": max(timings), "repeat": repeat}
+
+
+# Writes the league through the bulk ingestion path, then creates its fantasy teams.
+# Returns (throughput figures, IDs of the created teams, their rosters).
+def load_league(league, batch_size):
+    api_rows = league.api_rows()
+
+    start = time.perf_counter()
+    for season, players in api_rows.items():
+        process_season_bulk(season, players, batch_size)
+    ingest_seconds = time.perf_counter() - start
+
+    # Same payload again: every row is compared and left untouched
+    start = time.perf_counter()
+    for season, players in api_rows.items():
+        process_season_bulk(season, players, batch_size, incremental=True)
+    reingest_seconds = time.perf_counter() - start
+
+    player_ids = insert_players_bulk(f'Synthetic Player {player}' for player in range(league.players))
+    rosters = league.team_rosters(player_ids)
+    start = time.perf_counter()
+    team_ids = [main_create_team(f'Synthetic Team {i}', roster) for i, roster in enumerate(rosters)]
+    create_seconds = time.perf_counter() - start
+
+    return {
+        "ingest_seconds": ingest_seconds,
+        "ingest_rows_per_second": league.rows / ingest_seconds,
+        "reingest_seconds": reingest_seconds,
+        "reingest_rows_per_second": league.rows / reingest_seconds,
+        "create_team_seconds": create_seconds / len(team_ids) if team_ids else None,
+    }, team_ids, rosters
+
+
+def with_async_queries(function):
+    configure_async_queries(True)
+    try:
+        return function()
+    finally:
+        configure_async_queries(False)
+
+
+def cases(league, team_ids, rosters, client):
+    last_season = league.seasons[-1]
+    team_id = team_ids[0] if team_ids else 1
+    roster = rosters[0] if rosters else []
+    compared = '&'.join(f'team={compared_id}' for compared_id in team_ids[:COMPARED_TEAMS])
+
+    def get(url):
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        # Drain streamed bodies so the whole response is timed
+        response.get_data()
+
+    return {
+        "repository": {
+            "get_player_by_position": lambda: get_player_by_position('PG'),
+            "get_player_by_position_season": lambda: get_player_by_position('PG', [last_season]),
+            "get_latest_positions": lambda: get_latest_positions(roster),
+            "get_team_write_context": lambda: get_team_write_context(roster, 'Benchmark', team_id),
+            "get_all_player_seasons": get_all_player_seasons,
+        },
+        "service": {
+            "main_calc": lambda: main_calc.uncached('PG'),
+            "get_players_page": lambda: get_players_page('PG', limit=100),
+            "get_team_details": lambda: get_team_details.uncached(team_id),
+            "compare_teams_with_missing": lambda: compare_teams_with_missing(team_ids[:COMPARED_TEAMS]),
+            "get_team_stats_by_name": lambda: get_team_stats_by_name.uncached('LAL'),
+            "get_teams_stats_by_name": lambda: get_teams_stats_by_name.uncached(COMPARED_NAMES),
+            **({"get_teams_stats_by_name (asyncpg)": lambda: with_async_queries(
+                lambda: get_teams_stats_by_name.uncached(COMPARED_NAMES))} if ASYNC_AVAILABLE else {}),
+        },
+        "endpoint": {
+            "GET /api/players": lambda: get('/api/players?position=PG'),
+            "GET /api/players?limit=100": lambda: get('/api/players?position=PG&limit=100'),
+            "GET /api/players?format=ndjson": lambda: get('/api/players?position=PG&format=ndjson'),
+            "GET /api/teams/<id>": lambda: get(f'/api/teams/{team_id}'),
+            "GET /api/teams/compare": lambda: get(f'/api/teams/compare?{compared}'),
+            "GET /api/teams/stats": lambda: get('/api/teams/stats?team1=LAL&team2=BOS'),
+        },
+    }
+
+
+# Benchmarks one league size on a freshly created schema
+def run_size(league, repeat, batch_size, snapshot=False):
+    drop_all_tables()
+    create_tables()
+    configure_cache()
+    clear_snapshot()
+
+    ingestion, team_ids, rosters = load_league(league, batch_size)
+    if snapshot:
+        load_snapshot()
+
+    client = create_benchmark_app().test_client()
+    results = {}
+    for layer, layer_cases in cases(league, team_ids, rosters, client).items():
+        # Endpoints are timed on a cold cache; repository and service calls bypass it
+        before = configure_cache if layer == 'endpoint' else None
+        results[layer] = {name: time_case(function, repeat, before) for name, function in layer_cases.items()}
+
+    clear_snapshot()
+    return {
+        "league": league.name,
+        "players": league.players,
+        "seasons": len(league.seasons),
+        "teams": len(team_ids),
+        "rows": league.rows,
+        "snapshot": snapshot,
+        "ingestion": ingestion,
+        "cases": results,
+    }
+
+
+def run(sizes, repeat=5, batch_size=1000, snapshot=False, seed=0):
+    try:
+        return [run_size(League(*size, seed=seed), repeat, batch_size, snapshot) for size in sizes]
+    finally:
+        close_async_pool()
+        drop_all_tables()
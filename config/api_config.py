@@ -0,0 +1,14 @@
+import os
+
+NBA_API_URL = os.getenv('NBA_API_URL', 'http://b8c40s8.143.198.70.30.sslip.io/api/PlayerDataTotals/query')
+
+PAGE_SIZE = int(os.getenv('NBA_API_PAGE_SIZE', '100'))
+# Maximum number of page requests in flight at once
+FETCH_CONCURRENCY = int(os.getenv('NBA_API_CONCURRENCY', '4'))
+FETCH_TIMEOUT = float(os.getenv('NBA_API_TIMEOUT', '30'))
+FETCH_MAX_RETRIES = int(os.getenv('NBA_API_MAX_RETRIES', '4'))
+# Base delay in seconds for the exponential, jittered backoff between retries
+FETCH_BACKOFF_BASE = float(os.getenv('NBA_API_BACKOFF_BASE', '0.5'))
+
+DEFAULT_SEASONS = [int(season) for season in os.getenv('NBA_SEASONS', '2022,2023,2024').split(',')]
+INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', '1000'))
@@ -0,0 +1,16 @@
+import os
+
+# Exposes /api/debug/* (query fingerprints); keep disabled in production
+DEBUG_ENDPOINTS_ENABLED = os.getenv('DEBUG_ENDPOINTS_ENABLED', 'false').lower() == 'true'
+
+# Prometheus /metrics endpoint and request metrics (require prometheus_client)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+# gzip/brotli for response bodies of at least COMPRESSION_MIN_SIZE bytes, when the client accepts it
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+# gzip level 1-9; brotli quality is derived from it
+COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', '6'))
+
+# Run the hot read paths once at startup (wsgi.py), before the first request is accepted
+WARM_UP_ENABLED = os.getenv('WARM_UP_ENABLED', 'false').lower() == 'true'
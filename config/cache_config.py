@@ -0,0 +1,16 @@
+import os
+
+CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower() == 'true'
+# Seconds an entry stays valid, in process and in the shared backend
+CACHE_TTL = float(os.getenv('CACHE_TTL', '300'))
+CACHE_MAX_SIZE = int(os.getenv('CACHE_MAX_SIZE', '1024'))
+# Optional shared backend, e.g. redis://localhost:6379/0 (requires the redis package)
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'nba:')
+
+# In-process columnar snapshot of player_seasons (requires numpy), reloaded once older than the TTL
+STATS_SNAPSHOT_ENABLED = os.getenv('STATS_SNAPSHOT_ENABLED', 'false').lower() == 'true'
+STATS_SNAPSHOT_TTL = float(os.getenv('STATS_SNAPSHOT_TTL', '300'))
+
+# Seconds the data version is reused before it is read again (0 reads it on every request)
+DATA_VERSION_TTL = float(os.getenv('DATA_VERSION_TTL', '1'))
@@ -0,0 +1,61 @@
+import gzip
+
+from flask import request
+
+from config.app_config import COMPRESSION_MIN_SIZE, COMPRESSION_LEVEL
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# In order of preference when the client accepts several with the same quality
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson')
+
+
+def is_compressible(response):
+    return response.mimetype in COMPRESSIBLE_MIMETYPES or response.mimetype.startswith('text/')
+
+
+def compress(body, encoding, level=COMPRESSION_LEVEL):
+    if encoding == 'br':
+        # Brotli quality runs 0-11; level 6 maps to 5, which is close to gzip -6 in speed
+        return brotli.compress(body, quality=min(11, max(0, level - 1)))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+# The ETag of an encoded variant. Strong ETags promise identical bytes, so each encoding gets its own.
+def variant_etag(etag, encoding):
+    return f"{etag}-{encoding}"
+
+
+# Compresses buffered responses of at least `min_size` bytes with the best encoding the client accepts.
+# Streamed bodies (NDJSON) are sent as they are.
+def init_compression(app, min_size=COMPRESSION_MIN_SIZE, level=COMPRESSION_LEVEL):
+    @app.after_request
+    def compress_response(response):
+        # A 304 stands in for a body that may have been compressed, so it varies like the 200
+        if response.status_code == 304:
+            response.vary.add('Accept-Encoding')
+            return response
+
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers or not is_compressible(response)):
+            return response
+
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(ENCODINGS)
+        if encoding is None:
+            return response
+
+        response.set_data(compress(body, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(variant_etag(etag, encoding), weak)
+        return response
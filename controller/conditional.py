@@ -0,0 +1,52 @@
+import hashlib
+from functools import wraps
+
+import psycopg2
+from flask import request, make_response
+
+from controller.compression import ENCODINGS, variant_etag
+from service.data_version import current_data_version
+
+
+# The data version plus a digest of the path and query string: a tag is only ever handed out with
+# a 200, so one the client holds for this very request means the view would answer 200 again.
+# A tag from another URL (or a made-up one) cannot turn a 400 or 404 into a 304.
+def data_version_etag():
+    request_digest = hashlib.sha1(request.full_path.encode()).hexdigest()[:12]
+    return f"v{current_data_version()}-{request_digest}"
+
+
+# The tag the client already holds: the plain one or that of a compressed variant.
+# If-None-Match compares weakly, so W/"..." matches as well.
+def matching_etag(etag):
+    for candidate in (etag, *(variant_etag(etag, encoding) for encoding in ENCODINGS)):
+        if request.if_none_match.contains_weak(candidate):
+            return candidate
+    return None
+
+
+# Conditional GET for read endpoints: the strong ETag follows the data version, so a matching
+# If-None-Match is answered with 304 before the view (and the service layer) runs
+def conditional_on_data_version(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            etag = data_version_etag()
+        except psycopg2.Error:
+            # Without a version the view still answers, just not conditionally
+            return view(*args, **kwargs)
+
+        held_etag = matching_etag(etag)
+        if held_etag is not None:
+            response = make_response('', 304)
+            etag = held_etag
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag)
+        # Clients may keep the body but must revalidate it
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,72 @@
+from flask import Blueprint, request, jsonify, g, current_app
+
+from config.sql_config import QUERY_WARN_THRESHOLD
+from repository.database import get_pool_stats
+from repository.query_instrumentation import start_collecting, stop_collecting, record_collected, \
+    get_slowest_fingerprints, reset_fingerprint_stats
+from service.request_memo import get_request_memo_stats, get_memo_stats, reset_memo_stats
+
+debug_blueprint = Blueprint('debug', __name__)
+
+FINGERPRINT_ORDERS = ('total_time', 'max_time', 'count')
+
+
+# Records the statements of every request, reports them in X-DB-* headers and logs requests
+# that run more than `warn_threshold` statements
+def init_query_instrumentation(app, warn_threshold=QUERY_WARN_THRESHOLD):
+    @app.before_request
+    def start_query_collection():
+        g.query_collector, g.query_collector_token = start_collecting()
+
+    @app.after_request
+    def report_queries(response):
+        collector = g.get('query_collector')
+        # Streamed bodies run their queries after the headers are sent, so there is nothing to report
+        if collector is None or response.is_streamed:
+            return response
+
+        response.headers['X-DB-Queries'] = str(collector.count)
+        response.headers['X-DB-Time-Ms'] = f"{collector.total_time * 1000:.2f}"
+        response.headers['X-DB-Connections'] = str(collector.connections)
+        response.headers['X-DB-Acquire-Ms'] = f"{collector.acquire_time * 1000:.2f}"
+        # Statements the request-scoped memo answered instead of the database
+        response.headers['X-DB-Queries-Saved'] = str(get_request_memo_stats()['saved_queries'])
+
+        if collector.count > warn_threshold:
+            repeated = ', '.join(f"{count}x {query_fingerprint[:120]}"
+                                 for query_fingerprint, count in collector.repeated()[:3])
+            current_app.logger.warning("%s %s ran %d queries (threshold %d); repeated: %s",
+                                       request.method, request.path, collector.count, warn_threshold,
+                                       repeated or 'none')
+        record_collected(collector)
+        return response
+
+    @app.teardown_request
+    def stop_query_collection(exception=None):
+        token = g.pop('query_collector_token', None)
+        if token is not None:
+            stop_collecting(token)
+
+
+@debug_blueprint.route('/debug/queries', methods=['GET'])
+def slowest_queries():
+    order_by = request.args.get('order', 'total_time')
+    if order_by not in FINGERPRINT_ORDERS:
+        return jsonify({"error": f"order must be one of: {', '.join(FINGERPRINT_ORDERS)}"}), 400
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({"error": "Limit must be a number"}), 400
+
+    return jsonify({
+        "queries": get_slowest_fingerprints(limit, order_by),
+        "pool": get_pool_stats(),
+        "request_memo": get_memo_stats(),
+    }), 200
+
+
+@debug_blueprint.route('/debug/queries', methods=['DELETE'])
+def reset_queries():
+    reset_fingerprint_stats()
+    reset_memo_stats()
+    return jsonify({"message": "Query statistics reset"}), 200
@@ -0,0 +1,40 @@
+import time
+
+from flask import Blueprint, Response, jsonify, request, g
+
+from service.monitoring import METRICS_AVAILABLE, render_metrics, observe_request, request_started, \
+    request_finished, update_process_gauges
+
+metrics_blueprint = Blueprint('metrics', __name__)
+
+
+# Latency per route (the URL rule, so /teams/<int:team_id> is one series) and in-flight requests
+def init_request_metrics(app):
+    @app.before_request
+    def start_request_timer():
+        g.request_started_at = time.perf_counter()
+        request_started()
+
+    @app.after_request
+    def observe_request_latency(response):
+        started_at = g.get('request_started_at')
+        if started_at is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            observe_request(request.method, route, response.status_code, time.perf_counter() - started_at)
+            # Keep this worker's pool and cache gauges current for scrapes served by other workers
+            update_process_gauges()
+        return response
+
+    @app.teardown_request
+    def finish_request(exception=None):
+        if g.pop('request_started_at', None) is not None:
+            request_finished()
+
+
+@metrics_blueprint.route('/metrics', methods=['GET'])
+def metrics():
+    if not METRICS_AVAILABLE:
+        return jsonify({"error": "Metrics require the prometheus_client package"}), 503
+
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
@@ -1,21 +1,54 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, json
 
-from service.player_season_service import main_calc
+from controller.conditional import conditional_on_data_version
+from service.player_season_service import main_calc, get_players_page, stream_players, decode_cursor
 
 
 
 
 players_blueprint = Blueprint('players', __name__)
 
+MAX_PAGE_SIZE = 1000
+
 # 1. Get all answers
 @players_blueprint.route('/players', methods=['GET'])
+@conditional_on_data_version
 def get_players():
     position_options = ["PG", 'SG', 'SF', 'PF', 'C']
     position = request.args.get('position')
-    season = request.args.get('season', type=int)
+    team = request.args.get('team')
 
     if position not in position_options:
         return jsonify({"error": "Position is required"}), 400
 
-    result = main_calc(position, season)
+    # ?season=2023&season=2024 or ?season=2023,2024
+    try:
+        seasons = [int(season) for value in request.args.getlist('season') for season in value.split(',') if season]
+    except ValueError:
+        return jsonify({"error": "Season must be a number"}), 400
+
+    # Newline-delimited JSON, streamed from a server-side cursor
+    if request.args.get('format') == 'ndjson':
+        rows = stream_players(position, seasons, team)
+        return Response(stream_with_context(json.dumps(row) + '\n' for row in rows),
+                        mimetype='application/x-ndjson')
+
+    # Keyset pagination: ?limit=100 and then ?limit=100&after=<next from the previous page>
+    if 'limit' in request.args or 'after' in request.args:
+        try:
+            limit = int(request.args.get('limit', 100))
+        except ValueError:
+            return jsonify({"error": "Limit must be a number"}), 400
+        after = request.args.get('after')
+        if not 0 < limit <= MAX_PAGE_SIZE:
+            return jsonify({"error": f"Limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+        try:
+            if after:
+                decode_cursor(after)
+        except ValueError:
+            return jsonify({"error": "Invalid 'after' cursor"}), 400
+
+        return jsonify(get_players_page(position, seasons, team, limit, after))
+
+    result = main_calc(position, seasons, team)
     return jsonify(result)
\ No newline at end of file
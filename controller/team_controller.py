@@ -1,13 +1,20 @@
 from flask import Blueprint, request, jsonify
 
-from repository.team_repository import get_team_by_id, delete_team
-from service.team_service import main_create_team, validate_team_players, update_team_players, get_team_details, \
-    compare_teams, get_team_stats_by_name, compare_teams_by_name, get_last_season_position
+from controller.conditional import conditional_on_data_version
+from repository.team_repository import get_team_by_id
+from service.team_service import main_create_team, update_team_players, get_team_details, \
+    compare_teams_with_missing, compare_teams_by_name_with_missing, delete_team_by_id, TeamNotFoundError
 
 teams_blueprint = Blueprint('teams', __name__)
 
 
-REQUIRED_POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C']
+MAX_COMPARED_TEAMS = 99
+
+
+def requested_player_ids(players):
+    # Raises ValueError when an ID is not a number
+    return [int(player_id) for player_id in players]
+
 
 # 1. create team
 @teams_blueprint.route('/teams', methods=['POST'])
@@ -23,21 +30,16 @@ def create_team():
     if len(players) != 5:
         return jsonify({"error": "Team must have exactly 5 players"}), 400
 
-    # Fetch players' positions from the last season
-    player_positions = {}
-    for player_id in players:
-        last_season_position = get_last_season_position(player_id)
-        if not last_season_position:
-            return jsonify({"error": f"Player with ID {player_id} has no data for the last season"}), 400
-        player_positions[player_id] = last_season_position
-
-    # Check if all required positions are filled
-    missing_positions = [position for position in REQUIRED_POSITIONS if position not in player_positions.values()]
-    if missing_positions:
-        return jsonify({"error": f"Missing players for positions: {', '.join(missing_positions)}"}), 400
+    try:
+        player_ids = requested_player_ids(players)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Player IDs must be numbers"}), 400
+    if len(set(player_ids)) != len(player_ids):
+        return jsonify({"error": "Team must have 5 different players"}), 400
 
+    # Positions, the name check and the insert are resolved by the service in two round trips
     try:
-        team_id = main_create_team(name_team, player_positions)
+        team_id = main_create_team(name_team, player_ids)
         if team_id:
             return jsonify({"message": "Team created successfully", "team_id": team_id}), 201
         elif team_id is None:
@@ -55,11 +57,6 @@ def create_team():
 def update_team(team_id):
     data = request.get_json()
 
-    # Check if the team exists
-    team = get_team_by_id(team_id)
-    if not team:
-        return jsonify({"error": f"Team with ID {team_id} does not exist"}), 404
-
     # Ensure 'players' is provided and contains exactly 5 players
     if 'players' not in data or len(data['players']) != 5:
         return jsonify({"error": "Team must have exactly 5 players"}), 400
@@ -67,29 +64,24 @@ def update_team(team_id):
     # Ensure 'name_team' is provided for updating the team name
     name_team = data.get('name_team', None)
 
-    # Fetch players' positions from the last season for each player
-    player_positions = {}
-    for player_id in data['players']:
-        last_season_position = get_last_season_position(player_id)
-        if not last_season_position:
-            return jsonify({"error": f"Player with ID {player_id} has no data for the last season"}), 400
-        player_positions[player_id] = last_season_position
-
-    # Check if all required positions are filled
-    missing_positions = [position for position in REQUIRED_POSITIONS if position not in player_positions.values()]
-    if missing_positions:
-        return jsonify({"error": f"Missing players for positions: {', '.join(missing_positions)}"}), 400
-
-    # Validate that no player belongs to another team
-    existing_players = validate_team_players(player_positions, team_id)
-    if existing_players:
-        return jsonify({"error": f"Players already in other teams: {', '.join(map(str, existing_players))}"}), 400
-
-    # Try to update the team
     try:
-        update_team_players(team_id, player_positions, name_team)
+        player_ids = requested_player_ids(data['players'])
+    except (TypeError, ValueError):
+        return jsonify({"error": "Player IDs must be numbers"}), 400
+    if len(set(player_ids)) != len(player_ids):
+        return jsonify({"error": "Team must have 5 different players"}), 400
+
+    # Team existence, positions and other-team memberships are checked by the service in one query
+    try:
+        update_team_players(team_id, player_ids, name_team)
         return jsonify({"message": "Team updated successfully"}), 200
 
+    except TeamNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     except Exception as e:
         return jsonify({"error": f"An error occurred while updating the team: {str(e)}"}), 500
 
@@ -101,7 +93,7 @@ def delete_team_endpoint(team_id):
         return jsonify({"error": f"Team with ID {team_id} does not exist"}), 404
 
     try:
-        delete_team(team_id)
+        delete_team_by_id(team_id)
         return jsonify({"message": f"Team with ID {team_id} deleted successfully"}), 200
 
     except Exception as e:
@@ -110,6 +102,7 @@ def delete_team_endpoint(team_id):
 
 
 @teams_blueprint.route('/teams/<int:team_id>', methods=['GET'])
+@conditional_on_data_version
 def get_team(team_id):
     try:
         team_details = get_team_details(team_id)
@@ -123,22 +116,41 @@ def get_team(team_id):
         return jsonify({"error": f"An error occurred while retrieving the team: {str(e)}"}), 500
 
 
+def requested_team_ids():
+    # ?team=1&team=2, or the older ?team1=1&team2=2
+    values = request.args.getlist('team')
+    numbered = sorted(
+        (int(key[4:]), value) for key, value in request.args.items(multi=True)
+        if key.startswith('team') and key[4:].isdigit()
+    )
+    values += [value for _, value in numbered]
+
+    team_ids = []
+    for value in values:
+        team_id = int(value)
+        if team_id not in team_ids:
+            team_ids.append(team_id)
+    return team_ids
+
+
 @teams_blueprint.route('/teams/compare', methods=['GET'])
+@conditional_on_data_version
 def compare_teams_endpoint():
     try:
-        team_ids = [request.args.get(f"team{i}") for i in range(1, 100) if request.args.get(f"team{i}")]
+        try:
+            team_ids = requested_team_ids()
+        except ValueError:
+            return jsonify({"error": "Team IDs must be numbers."}), 400
 
         if len(team_ids) < 2:
             return jsonify({"error": "You must compare at least two teams."}), 400
+        if len(team_ids) > MAX_COMPARED_TEAMS:
+            return jsonify({"error": f"You can compare up to {MAX_COMPARED_TEAMS} teams only."}), 400
 
-        valid_team_ids = []
-        for team_id in team_ids:
-            if get_team_by_id(team_id):
-                valid_team_ids.append(team_id)
-            else:
-                return jsonify({"error": f"Team with ID {team_id} does not exist."}), 404
-
-        comparison_result = compare_teams(valid_team_ids)
+        # Existence check and comparison figures come from the same query
+        comparison_result, missing_team_ids = compare_teams_with_missing(team_ids)
+        if missing_team_ids:
+            return jsonify({"error": f"Team with ID {missing_team_ids[0]} does not exist."}), 404
 
         return jsonify(comparison_result), 200
 
@@ -148,6 +160,7 @@ def compare_teams_endpoint():
 
 
 @teams_blueprint.route('/teams/stats', methods=['GET'])
+@conditional_on_data_version
 def compare_teams_stats():
     try:
         team_names = [request.args.get(f"team{i}") for i in range(1, 4) if request.args.get(f"team{i}")]
@@ -157,15 +170,10 @@ def compare_teams_stats():
         if len(team_names) > 3:
             return jsonify({"error": "You can compare up to 3 teams only."}), 400
 
-        valid_team_names = []
-        for team_name in team_names:
-            team_stats = get_team_stats_by_name(team_name)
-            if team_stats:
-                valid_team_names.append(team_name)
-            else:
-                return jsonify({"error": f"Team '{team_name}' does not exist."}), 404
-
-        comparison_result = compare_teams_by_name(valid_team_names)
+        # Every name is looked up at once (concurrently with the async driver)
+        comparison_result, missing_team_names = compare_teams_by_name_with_missing(team_names)
+        if missing_team_names:
+            return jsonify({"error": f"Team '{missing_team_names[0]}' does not exist."}), 404
 
         return jsonify(comparison_result), 200
 
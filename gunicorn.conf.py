@@ -0,0 +1,35 @@
+import multiprocessing
+import os
+
+import psycopg2
+
+from repository.async_database import close_async_pool
+from repository.database import close_pool, get_pool
+from service.monitoring import mark_process_dead
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+
+# The app, its snapshot and warmed caches are built once in the master and shared copy-on-write
+preload_app = True
+
+
+def when_ready(server):
+    # Connections the master opened while loading are never used by the workers
+    close_pool()
+    close_async_pool()
+
+
+def post_fork(server, worker):
+    # Each worker opens its own pool before accepting requests
+    try:
+        get_pool().fill()
+    except psycopg2.Error as e:
+        server.log.warning("Worker %s could not open its database pool: %s", worker.pid, e)
+
+
+def child_exit(server, worker):
+    mark_process_dead(worker.pid)
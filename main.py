@@ -1,19 +1,65 @@
-import os
+import time
 
 from flask import Flask
 
+from config.app_config import DEBUG_ENDPOINTS_ENABLED, METRICS_ENABLED, COMPRESSION_ENABLED
+from config.sql_config import QUERY_INSTRUMENTATION
+from controller.compression import init_compression
+from controller.debug_controller import debug_blueprint, init_query_instrumentation
+from controller.json_provider import FastJSONProvider
+from controller.metrics_controller import metrics_blueprint, init_request_metrics
 from controller.players_controller import players_blueprint
 from controller.team_controller import teams_blueprint
-from repository.database import create_tables, drop_all_tables
+from repository.database import create_tables, drop_all_tables, get_pool
+from service.stats_snapshot import init_snapshot
+
+WARM_UP_POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C']
+
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
     app.register_blueprint(blueprint=players_blueprint, url_prefix='/api')
     app.register_blueprint(blueprint=teams_blueprint, url_prefix='/api')
+    if DEBUG_ENDPOINTS_ENABLED:
+        app.register_blueprint(blueprint=debug_blueprint, url_prefix='/api')
+
+    if QUERY_INSTRUMENTATION:
+        init_query_instrumentation(app)
+
+    if METRICS_ENABLED:
+        app.register_blueprint(blueprint=metrics_blueprint)
+        init_request_metrics(app)
+
+    if COMPRESSION_ENABLED:
+        init_compression(app)
+
+    # Columnar snapshot of player_seasons for the read endpoints, when enabled
+    init_snapshot()
+
+    return app
+
+
+# Opens the pool's connections and fills the caches the read endpoints start from, so the first
+# requests do not pay for them. Returns seconds per step.
+def warm_up(app):
+    timings = {}
+
+    def step(name, function):
+        start = time.perf_counter()
+        function()
+        timings[name] = time.perf_counter() - start
+
+    step('pool', lambda: get_pool().fill())
+    # Through the app, so the cache keys and code paths are the ones real requests use
+    client = app.test_client()
+    for position in WARM_UP_POSITIONS:
+        step(f'players_{position}', lambda: client.get(f'/api/players?position={position}').get_data())
+
+    app.logger.info("Warm-up done in %.3fs", sum(timings.values()))
+    return timings
 
-    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
-        return app
 
 if __name__ == '__main__':
     # create_tables()
@@ -1,8 +1,9 @@
-from dataclasses import dataclass
+from operator import itemgetter
+from typing import NamedTuple
 
 
-@dataclass
-class PlayerSeason:
+# Tuple-backed: immutable, no per-object __dict__, and already the row the repositories insert
+class PlayerSeason(NamedTuple):
     player_id: int
     position: str
     season: int
@@ -14,4 +15,29 @@ class PlayerSeason:
     ATR: float
     PPG_ratio: float
     assists: float
-    turnovers: float
\ No newline at end of file
+    turnovers: float
+
+    # From one row of the NBA stats API; missing keys take the defaults in _API_FIELDS
+    @classmethod
+    def from_api(cls, player_data, player_id):
+        try:
+            values = _api_values(player_data)
+        except KeyError:
+            get = player_data.get
+            values = [get(key, default) for key, default in _API_FIELDS]
+        return tuple.__new__(cls, (player_id, *values))
+
+    # From a player_seasons tuple: (player_id, position, season, team, points, games, two_percent,
+    # three_percent, atr, ppg_ratio, assists, turnovers)
+    @classmethod
+    def from_row(cls, row):
+        return tuple.__new__(cls, row)
+
+
+# API keys of every field after player_id, in field order, with their defaults
+_API_FIELDS = (
+    ('position', ''), ('season', ''), ('team', ''), ('points', 0), ('games', 0),
+    ('twoPercent', 0.0), ('threePercent', 0.0), ('ATR', 0.0), ('PPG_ratio', 0.0),
+    ('assists', 0.0), ('turnovers', 0.0),
+)
+_api_values = itemgetter(*(key for key, _ in _API_FIELDS))
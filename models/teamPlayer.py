@@ -1,8 +1,12 @@
-from dataclasses import dataclass
+from typing import NamedTuple
 
 
-@dataclass
-class TeamPlayer:
+class TeamPlayer(NamedTuple):
     player_id: int
     player_name: str
     player_position: str
+
+    # From a (player_id, player_name, player_position) tuple
+    @classmethod
+    def from_row(cls, row):
+        return tuple.__new__(cls, row)
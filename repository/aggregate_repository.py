@@ -0,0 +1,146 @@
+from repository.database import db_connection
+
+
+# fantasy_team_totals row built from player_career_totals rows aliased `ct`
+FANTASY_TOTALS_COLUMNS = '''
+    SUM(ct.total_points), SUM(ct.total_games),
+    SUM(ct.two_percent_sum), SUM(ct.two_percent_count),
+    SUM(ct.three_percent_sum), SUM(ct.three_percent_count),
+    SUM(ct.total_assists), SUM(ct.total_turnovers)
+'''
+
+FANTASY_TOTALS_ON_CONFLICT = '''
+    ON CONFLICT (team_id) DO UPDATE SET
+        total_points = EXCLUDED.total_points, total_games = EXCLUDED.total_games,
+        two_percent_sum = EXCLUDED.two_percent_sum, two_percent_count = EXCLUDED.two_percent_count,
+        three_percent_sum = EXCLUDED.three_percent_sum,
+        three_percent_count = EXCLUDED.three_percent_count,
+        total_assists = EXCLUDED.total_assists, total_turnovers = EXCLUDED.total_turnovers
+'''
+
+
+# Each refresh recomputes only the given keys from their source rows, inside the caller's transaction
+
+def refresh_player_career_totals(player_ids):
+    player_ids = list(player_ids)
+    with db_connection() as cursor:
+        cursor.execute('''
+            DELETE FROM player_career_totals WHERE player_id = ANY(%s)
+        ''', (player_ids,))
+
+        cursor.execute('''
+            INSERT INTO player_career_totals
+            SELECT player_id, SUM(points), SUM(games),
+                   SUM(two_percent), COUNT(two_percent), SUM(three_percent), COUNT(three_percent),
+                   SUM(assists), SUM(turnovers)
+            FROM player_seasons
+            WHERE player_id = ANY(%s)
+            GROUP BY player_id
+        ''', (player_ids,))
+
+
+def refresh_team_season_totals(seasons):
+    seasons = list(seasons)
+    with db_connection() as cursor:
+        cursor.execute('''
+            DELETE FROM team_season_totals WHERE season = ANY(%s)
+        ''', (seasons,))
+
+        cursor.execute('''
+            INSERT INTO team_season_totals
+            SELECT team, season, SUM(points), SUM(games),
+                   SUM(two_percent), COUNT(two_percent), SUM(three_percent), COUNT(three_percent),
+                   SUM(assists), SUM(turnovers)
+            FROM player_seasons
+            WHERE season = ANY(%s)
+            GROUP BY team, season
+        ''', (seasons,))
+
+
+# Only the given (team, season) groups, e.g. the old and new team of every row an ingested page wrote
+def refresh_team_season_groups(team_seasons):
+    team_seasons = list(team_seasons)
+    if not team_seasons:
+        return
+    teams = [team for team, _ in team_seasons]
+    seasons = [season for _, season in team_seasons]
+    with db_connection() as cursor:
+        cursor.execute('''
+            DELETE FROM team_season_totals t
+            USING unnest(%s::varchar[], %s::int[]) AS g(team, season)
+            WHERE t.team = g.team AND t.season = g.season
+        ''', (teams, seasons))
+
+        cursor.execute('''
+            INSERT INTO team_season_totals
+            SELECT ps.team, ps.season, SUM(ps.points), SUM(ps.games),
+                   SUM(ps.two_percent), COUNT(ps.two_percent), SUM(ps.three_percent), COUNT(ps.three_percent),
+                   SUM(ps.assists), SUM(ps.turnovers)
+            FROM player_seasons ps
+            JOIN (SELECT DISTINCT * FROM unnest(%s::varchar[], %s::int[])) AS g(team, season)
+                ON ps.team = g.team AND ps.season = g.season
+            GROUP BY ps.team, ps.season
+        ''', (teams, seasons))
+
+
+def refresh_player_latest_season(player_ids):
+    player_ids = list(player_ids)
+    with db_connection() as cursor:
+        cursor.execute('''
+            DELETE FROM player_latest_season WHERE player_id = ANY(%s)
+        ''', (player_ids,))
+
+        cursor.execute('''
+            INSERT INTO player_latest_season
+            SELECT DISTINCT ON (player_id) player_id, season, position
+            FROM player_seasons
+            WHERE player_id = ANY(%s)
+            ORDER BY player_id, season DESC
+        ''', (player_ids,))
+
+
+# Rolls the members' career totals up into their fantasy teams (run after refresh_player_career_totals)
+def refresh_fantasy_team_totals(team_ids):
+    team_ids = list(team_ids)
+    with db_connection() as cursor:
+        cursor.execute(f'''
+            INSERT INTO fantasy_team_totals
+            SELECT t.id, {FANTASY_TOTALS_COLUMNS}
+            FROM teams t
+            LEFT JOIN team_players tp ON tp.team_id = t.id
+            LEFT JOIN player_career_totals ct ON ct.player_id = tp.player_id
+            WHERE t.id = ANY(%s)
+            GROUP BY t.id
+            {FANTASY_TOTALS_ON_CONFLICT}
+        ''', (team_ids,))
+
+
+# After player_seasons changed for these players; `team_seasons` are the (team, season) groups
+# their rows were in before and after the change
+def refresh_aggregates_for_players(player_ids, team_seasons):
+    player_ids = list(player_ids)
+    with db_connection() as cursor:
+        refresh_player_career_totals(player_ids)
+        refresh_player_latest_season(player_ids)
+        refresh_team_season_groups(team_seasons)
+
+        cursor.execute('''
+            SELECT DISTINCT team_id FROM team_players WHERE player_id = ANY(%s)
+        ''', (player_ids,))
+        team_ids = [row['team_id'] for row in cursor.fetchall()]
+        if team_ids:
+            refresh_fantasy_team_totals(team_ids)
+
+
+def refresh_all_aggregates():
+    with db_connection() as cursor:
+        cursor.execute('SELECT id FROM players')
+        player_ids = [row['id'] for row in cursor.fetchall()]
+        refresh_player_career_totals(player_ids)
+        refresh_player_latest_season(player_ids)
+
+        cursor.execute('SELECT DISTINCT season FROM player_seasons')
+        refresh_team_season_totals(row['season'] for row in cursor.fetchall())
+
+        cursor.execute('SELECT id FROM teams')
+        refresh_fantasy_team_totals(row['id'] for row in cursor.fetchall())
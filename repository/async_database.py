@@ -0,0 +1,124 @@
+import asyncio
+import os
+import re
+import threading
+import time
+
+from config.sql_config import SQL_URI, ASYNC_DB_ENABLED, ASYNC_POOL_MIN_SIZE, ASYNC_POOL_MAX_SIZE, POOL_TIMEOUT
+from repository.query_instrumentation import get_collector, use_collector
+
+try:
+    import asyncpg
+except ImportError:  # every lookup goes through the psycopg2 pool instead
+    asyncpg = None
+
+ASYNC_AVAILABLE = asyncpg is not None
+
+# The views stay synchronous: they hand coroutines to an event loop running in a background thread
+# and wait for the result, so the lookups inside one call run concurrently on the asyncpg pool.
+_lock = threading.Lock()
+_loop = None
+_pool = None
+_pid = None
+_enabled = ASYNC_DB_ENABLED
+
+_PLACEHOLDERS = re.compile(r"%s|%%")
+
+
+def configure_async_queries(enabled=ASYNC_DB_ENABLED):
+    global _enabled
+    _enabled = enabled
+
+
+def async_queries_enabled():
+    return _enabled and ASYNC_AVAILABLE
+
+
+# The same statements serve both drivers: psycopg2's %s placeholders become asyncpg's $1, $2, ...
+def to_asyncpg(query):
+    numbers = iter(range(1, query.count('%s') + 1))
+    return _PLACEHOLDERS.sub(lambda match: f"${next(numbers)}" if match.group() == '%s' else '%', query)
+
+
+def _get_loop():
+    global _loop, _pool, _pid
+    with _lock:
+        # A loop inherited from a parent process has no thread running it in this one
+        if _loop is None or _pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _pool = None
+            _pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name='async-db', daemon=True).start()
+        return _loop
+
+
+async def _create_pool():
+    return await asyncpg.create_pool(SQL_URI, min_size=ASYNC_POOL_MIN_SIZE, max_size=ASYNC_POOL_MAX_SIZE)
+
+
+def _get_pool(loop):
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = asyncio.run_coroutine_threadsafe(_create_pool(), loop).result(POOL_TIMEOUT)
+        return _pool
+
+
+async def _run(coroutine, collector):
+    # Statements of the coroutine are reported to the caller's query collector
+    with use_collector(collector):
+        return await coroutine
+
+
+# Runs `coroutine` on the background loop and returns its result
+def run_async(coroutine, timeout=POOL_TIMEOUT):
+    loop = _get_loop()
+    try:
+        _get_pool(loop)
+    except Exception:
+        coroutine.close()
+        raise
+    future = asyncio.run_coroutine_threadsafe(_run(coroutine, get_collector()), loop)
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+def close_async_pool():
+    global _loop, _pool
+    with _lock:
+        if _loop is not None and _pid == os.getpid():
+            if _pool is not None:
+                asyncio.run_coroutine_threadsafe(_pool.close(), _loop).result(POOL_TIMEOUT)
+            _loop.call_soon_threadsafe(_loop.stop)
+        _loop = None
+        _pool = None
+
+
+async def _execute(method, query, args):
+    collector = get_collector()
+    start = time.perf_counter()
+    async with _pool.acquire() as connection:
+        if collector is not None:
+            collector.record_connection(time.perf_counter() - start)
+        query_start = time.perf_counter()
+        result = await getattr(connection, method)(to_asyncpg(query), *args)
+
+    if collector is not None:
+        rows = len(result) if isinstance(result, list) else int(result is not None)
+        collector.record_query(query, time.perf_counter() - query_start, rows)
+    return result
+
+
+async def fetch(query, *args):
+    return await _execute('fetch', query, args)
+
+
+async def fetchrow(query, *args):
+    return await _execute('fetchrow', query, args)
+
+
+async def gather(*coroutines):
+    return await asyncio.gather(*coroutines)
@@ -0,0 +1,22 @@
+from repository.database import db_connection
+
+
+def get_checkpoints(seasons):
+    with db_connection() as cursor:
+        cursor.execute('''
+            SELECT season, page, content_hash
+            FROM ingestion_checkpoints
+            WHERE season = ANY(%s)
+        ''', (list(seasons),))
+
+        return {(row['season'], row['page']): row['content_hash'] for row in cursor.fetchall()}
+
+
+def save_checkpoint(season, page, content_hash):
+    with db_connection() as cursor:
+        cursor.execute('''
+            INSERT INTO ingestion_checkpoints (season, page, content_hash, fetched_at)
+            VALUES (%s, %s, %s, now())
+            ON CONFLICT (season, page) DO UPDATE
+            SET content_hash = EXCLUDED.content_hash, fetched_at = EXCLUDED.fetched_at
+        ''', (season, page, content_hash))
@@ -0,0 +1,218 @@
+import os
+import threading
+import time
+import weakref
+from collections import deque
+
+import psycopg2
+from psycopg2.pool import PoolError
+
+
+class PoolExhaustedError(PoolError):
+    pass
+
+
+_pools = weakref.WeakSet()
+# Connections inherited from a parent process; kept referenced so they are never
+# garbage collected (and closed) in the child
+_orphaned_connections = []
+
+
+def _after_fork_in_child():
+    for pool in list(_pools):
+        pool._condition = threading.Condition()
+        pool._check_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class _PooledConnection:
+    __slots__ = ('connection', 'created_at', 'last_used_at')
+
+    def __init__(self, connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used_at = now
+
+
+class ConnectionPool:
+    """Thread-safe pool of psycopg2 connections.
+
+    Connections are health checked on checkout, recycled after ``max_lifetime``
+    seconds and never shared between a parent process and its forked workers.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=30.0,
+                 max_lifetime=1800.0, health_check_idle=30.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size: min_size must be between 0 and max_size")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_idle = health_check_idle
+
+        self._condition = threading.Condition()
+        self._reset_state()
+        _pools.add(self)
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'exhausted': 0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'connections_discarded': 0,
+        }
+
+    # Connections inherited from the parent process belong to the parent's sockets.
+    # They are dropped without being closed, so the parent keeps using them safely.
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            _orphaned_connections.extend(self._idle)
+            _orphaned_connections.extend(self._in_use.values())
+            self._reset_state()
+
+    def _open(self):
+        return _PooledConnection(self._connect())
+
+    def _discard(self, pooled):
+        self._size -= 1
+        self._stats['connections_discarded'] += 1
+        try:
+            pooled.connection.close()
+        except psycopg2.Error:
+            pass
+
+    def _is_usable(self, pooled):
+        connection = pooled.connection
+        if connection.closed:
+            return False
+
+        now = time.monotonic()
+        if self.max_lifetime and now - pooled.created_at > self.max_lifetime:
+            return False
+
+        if now - pooled.last_used_at > self.health_check_idle:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                connection.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def fill(self):
+        with self._condition:
+            self._check_fork()
+            while self._size < self.min_size:
+                self._idle.append(self._open())
+                self._size += 1
+                self._stats['connections_created'] += 1
+
+    # Takes an idle connection or reserves a slot for a new one (pooled is then None), waiting
+    # until one of them is possible. Called with the lock held.
+    def _reserve(self, started, waited):
+        while True:
+            if self._closed:
+                raise psycopg2.InterfaceError("connection pool is closed")
+            if self._idle:
+                return self._idle.pop(), waited
+            if self._size < self.max_size:
+                self._size += 1
+                return None, waited
+
+            if not waited:
+                self._stats['exhausted'] += 1
+                waited = True
+
+            remaining = self.timeout - (time.monotonic() - started)
+            if remaining <= 0 or not self._condition.wait(remaining):
+                if not self._idle and self._size >= self.max_size:
+                    self._stats['timeouts'] += 1
+                    raise PoolExhaustedError(
+                        f"No database connection available after {self.timeout} seconds")
+
+    # Connecting and health checks happen outside the lock, so one slow connection does not
+    # hold up every other checkout
+    def getconn(self):
+        started = time.monotonic()
+        waited = False
+
+        while True:
+            with self._condition:
+                self._check_fork()
+                pooled, waited = self._reserve(started, waited)
+
+            if pooled is None:
+                try:
+                    pooled = self._open()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+                with self._condition:
+                    self._stats['connections_created'] += 1
+                    return self._checkout(pooled, started, waited)
+
+            if self._is_usable(pooled):
+                with self._condition:
+                    return self._checkout(pooled, started, waited)
+
+            with self._condition:
+                self._discard(pooled)
+                self._condition.notify()
+
+    def _checkout(self, pooled, started, waited):
+        wait_time = time.monotonic() - started if waited else 0.0
+        self._stats['checkouts'] += 1
+        self._stats['wait_time_total'] += wait_time
+        self._stats['wait_time_max'] = max(self._stats['wait_time_max'], wait_time)
+        self._in_use[id(pooled.connection)] = pooled
+        return pooled.connection
+
+    def putconn(self, connection, discard=False):
+        with self._condition:
+            pooled = self._in_use.pop(id(connection), None)
+            if pooled is None:
+                # Checked out before a fork or a close, not ours to reuse
+                return
+
+            if discard or self._closed or connection.closed:
+                self._discard(pooled)
+            else:
+                pooled.last_used_at = time.monotonic()
+                self._idle.append(pooled)
+            self._condition.notify()
+
+    def closeall(self):
+        with self._condition:
+            self._check_fork()
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            return {
+                **self._stats,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            }
@@ -0,0 +1,17 @@
+from repository.database import db_connection
+
+# CTE / statement that bumps the version, for writes that want it in their own statement
+BUMP_DATA_VERSION = 'UPDATE data_version SET version = version + 1 RETURNING version'
+
+
+def get_data_version():
+    with db_connection() as cursor:
+        cursor.execute('SELECT version FROM data_version')
+        return cursor.fetchone()['version']
+
+
+# Bumps the version inside the caller's transaction, so it becomes visible together with the write
+def bump_data_version():
+    with db_connection() as cursor:
+        cursor.execute(BUMP_DATA_VERSION)
+        return cursor.fetchone()['version']
@@ -1,105 +1,145 @@
+import threading
+import time
 from contextlib import contextmanager
+from contextvars import ContextVar
 
 import psycopg2
-from psycopg2.extras import RealDictConnection, RealDictCursor
-from config.sql_config import SQL_URI
+from config.sql_config import SQL_URI, POOL_MIN_SIZE, POOL_MAX_SIZE, POOL_TIMEOUT, POOL_MAX_LIFETIME, \
+    POOL_HEALTH_CHECK_IDLE
+from repository.connection_pool import ConnectionPool
+from repository.query_instrumentation import InstrumentedCursor, record_connection
 
 
+# Rows come back as dicts; statements are reported to the active query collector, if any
 def get_db_connection():
-    return psycopg2.connect(SQL_URI, cursor_factory=RealDictCursor)
+    return psycopg2.connect(SQL_URI, cursor_factory=InstrumentedCursor)
 
 
-def create_tables():
-    connection = get_db_connection()
-    cursor = connection.cursor()
+def _checkout(pool):
+    start = time.perf_counter()
+    connection = pool.getconn()
+    record_connection(time.perf_counter() - start)
+    return connection
 
-    # Create the Players table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS players (
-        id SERIAL PRIMARY KEY,
-        player_name VARCHAR(100) NOT NULL,
-        UNIQUE(player_name)
-    );
-    ''')
-
-    # Create the Player Seasons table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS player_seasons (
-        id SERIAL PRIMARY KEY,
-        player_id INT REFERENCES players(id) ON DELETE CASCADE,
-        position VARCHAR(50) NOT NULL, 
-        season INT NOT NULL,
-        team VARCHAR(50) NOT NULL, 
-        points INTEGER NOT NULL,
-        games INTEGER NOT NULL,
-        two_percent FLOAT,
-        three_percent FLOAT,
-        atr FLOAT,  
-        ppg_ratio FLOAT,  
-        assists FLOAT,
-        turnovers FLOAT,
-        UNIQUE(player_id, season) 
-    );
-    ''')
-
-# -- Ensure each player has unique stats per season
-
-    # Create the Teams table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS teams (
-        id SERIAL PRIMARY KEY,
-        team_name VARCHAR(100) NOT NULL UNIQUE
-    );
-    ''')
-
-    # Create the Team-Player mapping (Many-to-Many relationship)
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS team_players (
-        team_id INT REFERENCES teams(id) ON DELETE CASCADE,
-        player_id INT REFERENCES players(id) ON DELETE CASCADE,
-        player_name VARCHAR(50) NOT NULL,
-        player_position VARCHAR(50) NOT NULL, 
-        PRIMARY KEY (team_id, player_id)  -- Prevent duplicate player in the same team
-    );
-    ''')
-
-    connection.commit()
-    cursor.close()
-    connection.close()
 
+_pool = None
+_pool_lock = threading.Lock()
 
+# Connection of the transaction currently open in this context (thread / task)
+_current_connection = ContextVar('current_connection', default=None)
 
 
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    get_db_connection,
+                    min_size=POOL_MIN_SIZE,
+                    max_size=POOL_MAX_SIZE,
+                    timeout=POOL_TIMEOUT,
+                    max_lifetime=POOL_MAX_LIFETIME,
+                    health_check_idle=POOL_HEALTH_CHECK_IDLE,
+                )
+    return _pool
 
-def drop_all_tables():
-    connection = get_db_connection()
-    cursor = connection.cursor()
 
-    # Dropping tables in the correct order due to foreign key dependencies
-    cursor.execute('''
-        DROP TABLE IF EXISTS team_players;
-        DROP TABLE IF EXISTS player_seasons;
-        DROP TABLE IF EXISTS players;
-        DROP TABLE IF EXISTS teams;  
-    ''')
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
 
-    connection.commit()
-    cursor.close()
-    connection.close()
 
+def get_pool_stats():
+    if _pool is None:
+        return None
+    return _pool.stats()
 
 
+# The schema is owned by repository.migrations; these remain as the familiar entry points
+def create_tables():
+    from repository.migrations import migrate
+    migrate()
+
 
+def drop_all_tables():
+    from repository.migrations import drop_schema
+    drop_schema()
+
+
+def in_transaction():
+    return _current_connection.get() is not None
+
+
+# Nested calls join the transaction of the outermost db_connection() instead of
+# checking out another connection; only the outermost block commits or rolls back.
 @contextmanager
 def db_connection():
-    connection = get_db_connection()
+    shared_connection = _current_connection.get()
+    if shared_connection is not None:
+        cursor = shared_connection.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+        return
+
+    pool = get_pool()
+    connection = _checkout(pool)
+    token = _current_connection.set(connection)
     cursor = connection.cursor()
+    broken = False
     try:
         yield cursor
         connection.commit()
     except Exception as e:
-        connection.rollback()
+        try:
+            connection.rollback()
+        except psycopg2.Error:
+            broken = True
         raise e
     finally:
         cursor.close()
-        connection.close()
\ No newline at end of file
+        _current_connection.reset(token)
+        pool.putconn(connection, discard=broken)
+
+
+# Groups several repository calls into one transaction on one connection
+@contextmanager
+def unit_of_work():
+    with db_connection() as cursor:
+        yield cursor
+
+
+# Runs the repository calls inside the block on `connection` (committing is up to the caller)
+@contextmanager
+def use_connection(connection):
+    token = _current_connection.set(connection)
+    try:
+        yield connection
+    finally:
+        _current_connection.reset(token)
+
+
+# Server-side cursor for streaming large results in chunks of `itersize` rows. It runs on its own
+# pooled connection that is deliberately not bound as the current transaction, because the
+# caller is usually a generator that yields between fetches.
+@contextmanager
+def db_named_cursor(name, itersize=1000):
+    pool = get_pool()
+    connection = _checkout(pool)
+    cursor = connection.cursor(name=name)
+    cursor.itersize = itersize
+    broken = False
+    try:
+        yield cursor
+    finally:
+        try:
+            cursor.close()
+            connection.rollback()
+        except psycopg2.Error:
+            broken = True
+        pool.putconn(connection, discard=broken)
@@ -0,0 +1,287 @@
+import argparse
+from collections import namedtuple
+
+from repository.database import db_connection
+
+Migration = namedtuple('Migration', ['version', 'name', 'up', 'down'])
+
+# Append new migrations at the end; never edit one that has been released
+MIGRATIONS = [
+    Migration(1, 'create base tables', '''
+        CREATE TABLE IF NOT EXISTS players (
+            id SERIAL PRIMARY KEY,
+            player_name VARCHAR(100) NOT NULL,
+            UNIQUE(player_name)
+        );
+
+        -- Ensure each player has unique stats per season
+        CREATE TABLE IF NOT EXISTS player_seasons (
+            id SERIAL PRIMARY KEY,
+            player_id INT REFERENCES players(id) ON DELETE CASCADE,
+            position VARCHAR(50) NOT NULL,
+            season INT NOT NULL,
+            team VARCHAR(50) NOT NULL,
+            points INTEGER NOT NULL,
+            games INTEGER NOT NULL,
+            two_percent FLOAT,
+            three_percent FLOAT,
+            atr FLOAT,
+            ppg_ratio FLOAT,
+            assists FLOAT,
+            turnovers FLOAT,
+            UNIQUE(player_id, season)
+        );
+
+        CREATE TABLE IF NOT EXISTS teams (
+            id SERIAL PRIMARY KEY,
+            team_name VARCHAR(100) NOT NULL UNIQUE
+        );
+
+        -- Team-Player mapping (Many-to-Many relationship)
+        CREATE TABLE IF NOT EXISTS team_players (
+            team_id INT REFERENCES teams(id) ON DELETE CASCADE,
+            player_id INT REFERENCES players(id) ON DELETE CASCADE,
+            player_name VARCHAR(50) NOT NULL,
+            player_position VARCHAR(50) NOT NULL,
+            PRIMARY KEY (team_id, player_id)  -- Prevent duplicate player in the same team
+        );
+    ''', '''
+        DROP TABLE IF EXISTS team_players;
+        DROP TABLE IF EXISTS player_seasons;
+        DROP TABLE IF EXISTS players;
+        DROP TABLE IF EXISTS teams;
+    '''),
+
+    Migration(2, 'ingestion checkpoints', '''
+        -- Last fetched content of every API page, used by incremental ingestion
+        CREATE TABLE IF NOT EXISTS ingestion_checkpoints (
+            season INT NOT NULL,
+            page INT NOT NULL,
+            content_hash CHAR(64) NOT NULL,
+            fetched_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (season, page)
+        );
+    ''', '''
+        DROP TABLE IF EXISTS ingestion_checkpoints;
+    '''),
+
+    Migration(3, 'indexes for hot query predicates', '''
+        -- get_player_by_position: WHERE position = ..., narrowed and ordered by season
+        CREATE INDEX IF NOT EXISTS idx_player_seasons_position_season
+            ON player_seasons (position, season, player_id);
+
+        -- get_team_stats_by_name: index-only aggregation over one team's rows
+        CREATE INDEX IF NOT EXISTS idx_player_seasons_team
+            ON player_seasons (team)
+            INCLUDE (points, games, two_percent, three_percent, assists, turnovers);
+
+        -- a player's last season: WHERE player_id = ... ORDER BY season DESC LIMIT 1
+        CREATE INDEX IF NOT EXISTS idx_player_seasons_player_latest
+            ON player_seasons (player_id, season DESC)
+            INCLUDE (position);
+
+        -- find_team_player_by_id: team_players' primary key starts with team_id
+        CREATE INDEX IF NOT EXISTS idx_team_players_player_id
+            ON team_players (player_id);
+    ''', '''
+        DROP INDEX IF EXISTS idx_team_players_player_id;
+        DROP INDEX IF EXISTS idx_player_seasons_player_latest;
+        DROP INDEX IF EXISTS idx_player_seasons_team;
+        DROP INDEX IF EXISTS idx_player_seasons_position_season;
+    '''),
+
+    Migration(4, 'aggregate tables', '''
+        -- Averages are stored as sum + count of non-null values so totals can be combined exactly
+        CREATE TABLE IF NOT EXISTS player_career_totals (
+            player_id INT PRIMARY KEY REFERENCES players(id) ON DELETE CASCADE,
+            total_points BIGINT NOT NULL,
+            total_games BIGINT NOT NULL,
+            two_percent_sum FLOAT,
+            two_percent_count INT NOT NULL,
+            three_percent_sum FLOAT,
+            three_percent_count INT NOT NULL,
+            total_assists FLOAT,
+            total_turnovers FLOAT
+        );
+
+        -- Per NBA team (player_seasons.team) and season
+        CREATE TABLE IF NOT EXISTS team_season_totals (
+            team VARCHAR(50) NOT NULL,
+            season INT NOT NULL,
+            total_points BIGINT NOT NULL,
+            total_games BIGINT NOT NULL,
+            two_percent_sum FLOAT,
+            two_percent_count INT NOT NULL,
+            three_percent_sum FLOAT,
+            three_percent_count INT NOT NULL,
+            total_assists FLOAT,
+            total_turnovers FLOAT,
+            PRIMARY KEY (team, season)
+        );
+
+        -- Per fantasy team (teams / team_players), over its players' careers
+        CREATE TABLE IF NOT EXISTS fantasy_team_totals (
+            team_id INT PRIMARY KEY REFERENCES teams(id) ON DELETE CASCADE,
+            total_points BIGINT,
+            total_games BIGINT,
+            two_percent_sum FLOAT,
+            two_percent_count INT,
+            three_percent_sum FLOAT,
+            three_percent_count INT,
+            total_assists FLOAT,
+            total_turnovers FLOAT
+        );
+
+        INSERT INTO player_career_totals
+        SELECT player_id, SUM(points), SUM(games),
+               SUM(two_percent), COUNT(two_percent), SUM(three_percent), COUNT(three_percent),
+               SUM(assists), SUM(turnovers)
+        FROM player_seasons
+        GROUP BY player_id
+        ON CONFLICT DO NOTHING;
+
+        INSERT INTO team_season_totals
+        SELECT team, season, SUM(points), SUM(games),
+               SUM(two_percent), COUNT(two_percent), SUM(three_percent), COUNT(three_percent),
+               SUM(assists), SUM(turnovers)
+        FROM player_seasons
+        GROUP BY team, season
+        ON CONFLICT DO NOTHING;
+
+        INSERT INTO fantasy_team_totals
+        SELECT t.id, SUM(ct.total_points), SUM(ct.total_games),
+               SUM(ct.two_percent_sum), SUM(ct.two_percent_count),
+               SUM(ct.three_percent_sum), SUM(ct.three_percent_count),
+               SUM(ct.total_assists), SUM(ct.total_turnovers)
+        FROM teams t
+        LEFT JOIN team_players tp ON tp.team_id = t.id
+        LEFT JOIN player_career_totals ct ON ct.player_id = tp.player_id
+        GROUP BY t.id
+        ON CONFLICT DO NOTHING;
+    ''', '''
+        DROP TABLE IF EXISTS fantasy_team_totals;
+        DROP TABLE IF EXISTS team_season_totals;
+        DROP TABLE IF EXISTS player_career_totals;
+    '''),
+
+    Migration(5, 'latest season projection', '''
+        -- Position of every player in their most recent season, kept up to date by ingestion
+        CREATE TABLE IF NOT EXISTS player_latest_season (
+            player_id INT PRIMARY KEY REFERENCES players(id) ON DELETE CASCADE,
+            season INT NOT NULL,
+            position VARCHAR(50) NOT NULL
+        );
+
+        INSERT INTO player_latest_season
+        SELECT DISTINCT ON (player_id) player_id, season, position
+        FROM player_seasons
+        ORDER BY player_id, season DESC
+        ON CONFLICT DO NOTHING;
+    ''', '''
+        DROP TABLE IF EXISTS player_latest_season;
+    '''),
+
+    Migration(6, 'data version', '''
+        -- Single row counter bumped by every write that changes what the read endpoints return
+        CREATE TABLE IF NOT EXISTS data_version (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            version BIGINT NOT NULL
+        );
+
+        INSERT INTO data_version (id, version) VALUES (TRUE, 1) ON CONFLICT DO NOTHING;
+    ''', '''
+        DROP TABLE IF EXISTS data_version;
+    '''),
+]
+
+# Arbitrary key for pg_advisory_xact_lock, so concurrent workers never migrate at the same time
+MIGRATION_LOCK_ID = 7_402_116
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    ''')
+
+
+def _applied_versions(cursor):
+    cursor.execute('SELECT version FROM schema_migrations')
+    return {row['version'] for row in cursor.fetchall()}
+
+
+def current_version():
+    with db_connection() as cursor:
+        cursor.execute("SELECT to_regclass('schema_migrations') AS migrations_table")
+        if cursor.fetchone()['migrations_table'] is None:
+            return 0
+        cursor.execute('SELECT COALESCE(MAX(version), 0) AS version FROM schema_migrations')
+        return cursor.fetchone()['version']
+
+
+# Applies every pending migration up to `target` (all of them by default) in one transaction.
+# Returns the versions that were applied.
+def migrate(target=None):
+    with db_connection() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', (MIGRATION_LOCK_ID,))
+        _ensure_migrations_table(cursor)
+        applied = _applied_versions(cursor)
+
+        newly_applied = []
+        for migration in MIGRATIONS:
+            if migration.version in applied or (target is not None and migration.version > target):
+                continue
+            cursor.execute(migration.up)
+            cursor.execute('''
+                INSERT INTO schema_migrations (version, name) VALUES (%s, %s)
+            ''', (migration.version, migration.name))
+            newly_applied.append(migration.version)
+
+    return newly_applied
+
+
+# Reverts applied migrations newer than `target` (all of them by default), newest first
+def rollback(target=0):
+    with db_connection() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', (MIGRATION_LOCK_ID,))
+        _ensure_migrations_table(cursor)
+        applied = _applied_versions(cursor)
+
+        reverted = []
+        for migration in reversed(MIGRATIONS):
+            if migration.version not in applied or migration.version <= target:
+                continue
+            cursor.execute(migration.down)
+            cursor.execute('DELETE FROM schema_migrations WHERE version = %s', (migration.version,))
+            reverted.append(migration.version)
+
+    return reverted
+
+
+# Drops every table the migrations know about, whatever the recorded version
+def drop_schema():
+    with db_connection() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', (MIGRATION_LOCK_ID,))
+        for migration in reversed(MIGRATIONS):
+            cursor.execute(migration.down)
+        cursor.execute('DROP TABLE IF EXISTS schema_migrations;')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply or revert database schema migrations")
+    parser.add_argument('command', choices=['migrate', 'rollback', 'status'])
+    parser.add_argument('--target', type=int, default=None, help="version to migrate or roll back to")
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        print(f"Applied migrations: {migrate(args.target) or 'none'}")
+    elif args.command == 'rollback':
+        print(f"Reverted migrations: {rollback(args.target or 0) or 'none'}")
+    print(f"Schema version: {current_version()} (latest {MIGRATIONS[-1].version})")
+
+
+if __name__ == '__main__':
+    main()
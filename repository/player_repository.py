@@ -1,3 +1,5 @@
+from psycopg2.extras import execute_values
+
 from repository.database import db_connection
 
 
@@ -48,4 +50,24 @@ def get_player_name_by_id(player_id):
             player_name = result['player_name']
             return player_name
         else:
-            return None
\ No newline at end of file
+            return None
+
+
+# Inserts any new names in one statement and returns {player_name: id} for all of them
+def insert_players_bulk(player_names, page_size=1000):
+    player_names = list(set(player_names))
+    if not player_names:
+        return {}
+
+    with db_connection() as cursor:
+        execute_values(cursor, '''
+            INSERT INTO players (player_name)
+            VALUES %s
+            ON CONFLICT (player_name) DO NOTHING
+        ''', [(player_name,) for player_name in player_names], page_size=page_size)
+
+        cursor.execute('''
+            SELECT id, player_name FROM players WHERE player_name = ANY(%s)
+        ''', (player_names,))
+
+        return {row['player_name']: row['id'] for row in cursor.fetchall()}
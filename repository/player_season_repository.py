@@ -1,5 +1,7 @@
+from psycopg2.extras import execute_values
+
 from models.playerSeason import PlayerSeason
-from repository.database import db_connection
+from repository.database import db_connection, db_named_cursor
 
 
 def insert_player_season(player_season:PlayerSeason):
@@ -30,14 +32,160 @@ def insert_player_season(player_season:PlayerSeason):
     return new_id
 
 
-def get_player_by_position(position):
+# Inserts many seasons in batched statements and returns how many rows were new
+def insert_player_seasons_bulk(player_seasons, page_size=1000):
+    if not player_seasons:
+        return 0
+
+    # A PlayerSeason is already a tuple in player_seasons column order
+    rows = list(player_seasons)
+
+    with db_connection() as cursor:
+        inserted = execute_values(cursor, '''
+            INSERT INTO player_seasons 
+            (player_id, position, season, team, points, games, 
+            two_percent, three_percent, atr, ppg_ratio, 
+            assists, turnovers)
+            VALUES %s
+            ON CONFLICT (player_id, season) DO NOTHING
+            RETURNING id;
+        ''', rows, page_size=page_size, fetch=True)
+
+    return len(inserted)
+
+
+# (team, season) groups the players' rows of these seasons are in
+def get_team_seasons(player_ids, seasons):
     with db_connection() as cursor:
         cursor.execute('''
-            SELECT p.id, p.player_name, ps.team, ps.season, ps.points, ps.games, ps.two_percent, ps.three_percent, ps.assists, ps.turnovers
+            SELECT DISTINCT team, season FROM player_seasons
+            WHERE player_id = ANY(%s) AND season = ANY(%s)
+        ''', (list(player_ids), list(seasons)))
+        return {(row['team'], row['season']) for row in cursor.fetchall()}
+
+
+# Inserts new seasons and updates only the rows whose stats changed.
+# Returns (inserted, updated); rows that are identical are left untouched.
+def upsert_player_seasons_bulk(player_seasons, page_size=1000):
+    # A row can only be updated once per statement, so keep the first row of each (player, season)
+    unique_rows = {}
+    for player_season in player_seasons:
+        unique_rows.setdefault((player_season.player_id, player_season.season), player_season)
+    if not unique_rows:
+        return 0, 0
+
+    with db_connection() as cursor:
+        results = execute_values(cursor, '''
+            INSERT INTO player_seasons 
+            (player_id, position, season, team, points, games, 
+            two_percent, three_percent, atr, ppg_ratio, 
+            assists, turnovers)
+            VALUES %s
+            ON CONFLICT (player_id, season) DO UPDATE SET
+                position = EXCLUDED.position, team = EXCLUDED.team,
+                points = EXCLUDED.points, games = EXCLUDED.games,
+                two_percent = EXCLUDED.two_percent, three_percent = EXCLUDED.three_percent,
+                atr = EXCLUDED.atr, ppg_ratio = EXCLUDED.ppg_ratio,
+                assists = EXCLUDED.assists, turnovers = EXCLUDED.turnovers
+            WHERE (player_seasons.position, player_seasons.team, player_seasons.points, player_seasons.games,
+                   player_seasons.two_percent, player_seasons.three_percent, player_seasons.atr,
+                   player_seasons.ppg_ratio, player_seasons.assists, player_seasons.turnovers)
+                IS DISTINCT FROM
+                  (EXCLUDED.position, EXCLUDED.team, EXCLUDED.points, EXCLUDED.games,
+                   EXCLUDED.two_percent, EXCLUDED.three_percent, EXCLUDED.atr,
+                   EXCLUDED.ppg_ratio, EXCLUDED.assists, EXCLUDED.turnovers)
+            RETURNING (xmax = 0) AS inserted;
+        ''', list(unique_rows.values()), page_size=page_size, fetch=True)
+
+    inserted = sum(1 for row in results if row['inserted'])
+    return inserted, len(results) - inserted
+
+
+# atr and ppg follow service/derived_stats.py: NULL when the denominator is zero or missing
+PLAYER_BY_POSITION_COLUMNS = '''
+    p.id, p.player_name, ps.team, ps.season, ps.points, ps.games, ps.two_percent, ps.three_percent, ps.assists, ps.turnovers,
+    ps.assists / NULLIF(ps.turnovers, 0) as atr,
+    ps.points::float / NULLIF(ps.games, 0) as ppg
+'''
+
+
+def _position_filters(position, seasons=None, team=None, after=None):
+    conditions = ['ps.position = %s']
+    params = [position]
+    if seasons:
+        conditions.append('ps.season = ANY(%s)')
+        params.append(list(seasons))
+    if team:
+        conditions.append('ps.team = %s')
+        params.append(team)
+    if after:
+        # Keyset pagination: everything after the (season, player_id) of the previous page
+        conditions.append('(ps.season, ps.player_id) > (%s, %s)')
+        params.extend(after)
+    return ' AND '.join(conditions), params
+
+
+# `seasons` (a list of seasons) and `team` are optional filters applied in the WHERE clause.
+# Rows come ordered by (season, player_id); `limit` and `after` page through them.
+def get_player_by_position(position, seasons=None, team=None, limit=None, after=None):
+    where, params = _position_filters(position, seasons, team, after)
+    limit_clause = ''
+    if limit is not None:
+        limit_clause = 'LIMIT %s'
+        params.append(limit)
+
+    with db_connection() as cursor:
+        cursor.execute(f'''
+            SELECT {PLAYER_BY_POSITION_COLUMNS}
             FROM players p
             JOIN player_seasons ps ON p.id = ps.player_id
-            WHERE ps.position = %s
-        ''', (position,))
+            WHERE {where}
+            ORDER BY ps.season, ps.player_id
+            {limit_clause}
+        ''', params)
 
         players = cursor.fetchall()
     return players
+
+
+# Same rows as get_player_by_position, streamed from a server-side cursor
+def iter_player_by_position(position, seasons=None, team=None, itersize=1000):
+    where, params = _position_filters(position, seasons, team)
+
+    with db_named_cursor('players_by_position', itersize) as cursor:
+        cursor.execute(f'''
+            SELECT {PLAYER_BY_POSITION_COLUMNS}
+            FROM players p
+            JOIN player_seasons ps ON p.id = ps.player_id
+            WHERE {where}
+            ORDER BY ps.season, ps.player_id
+        ''', params)
+
+        for player in cursor:
+            yield player
+
+
+# {player_id: position in their latest season}, from the player_latest_season projection.
+# Players without any season are left out.
+def get_latest_positions(player_ids):
+    with db_connection() as cursor:
+        cursor.execute('''
+            SELECT player_id, position
+            FROM player_latest_season
+            WHERE player_id = ANY(%s)
+        ''', (list(player_ids),))
+        return {row['player_id']: row['position'] for row in cursor.fetchall()}
+
+
+# Every season of every player, ordered like get_player_by_position, to build the stats snapshot
+def get_all_player_seasons():
+    with db_connection() as cursor:
+        cursor.execute('''
+            SELECT 
+                ps.player_id, p.player_name, ps.position, ps.season, ps.team, ps.points, ps.games,
+                ps.two_percent, ps.three_percent, ps.assists, ps.turnovers
+            FROM player_seasons ps
+            JOIN players p ON p.id = ps.player_id
+            ORDER BY ps.season, ps.player_id
+        ''')
+        return cursor.fetchall()
@@ -0,0 +1,158 @@
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from psycopg2.extras import RealDictCursor
+
+# Collector of the request (or block) currently being instrumented in this context
+_collector = ContextVar('query_collector', default=None)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%(?:\(\w+\))?s")
+_WHITESPACE = re.compile(r"\s+")
+# Row lists expanded by execute_values: (?, ?), (?, ?), ...
+_VALUE_LISTS = re.compile(r"\(\?(?:, ?\?)*\)(?:, ?\(\?(?:, ?\?)*\))+")
+
+# Fingerprints beyond this many are not aggregated, so odd one-off statements cannot grow it forever
+MAX_FINGERPRINTS = 1000
+
+
+# The statement with its literals and placeholders replaced by ?, so repeated queries group together
+def fingerprint(query):
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    query = _LITERALS.sub('?', query)
+    query = _PLACEHOLDERS.sub('?', query)
+    query = _WHITESPACE.sub(' ', query).strip()
+    return _VALUE_LISTS.sub('(...)', query)
+
+
+class QueryCollector:
+    """Statements and connection checkouts of one request."""
+
+    def __init__(self):
+        self.queries = []
+        self.connections = 0
+        self.acquire_time = 0.0
+
+    def record_query(self, query, duration, rows):
+        self.queries.append((fingerprint(query), duration, rows))
+
+    def record_connection(self, acquire_time):
+        self.connections += 1
+        self.acquire_time += acquire_time
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(duration for _, duration, _ in self.queries)
+
+    # [(fingerprint, executions)] of statements run at least `min_count` times, most repeated first;
+    # the usual sign of an N+1 loop
+    def repeated(self, min_count=2):
+        counts = {}
+        for query_fingerprint, _, _ in self.queries:
+            counts[query_fingerprint] = counts.get(query_fingerprint, 0) + 1
+        return sorted(((query_fingerprint, count) for query_fingerprint, count in counts.items()
+                       if count >= min_count), key=lambda item: item[1], reverse=True)
+
+
+class InstrumentedCursor(RealDictCursor):
+    """RealDictCursor that reports every statement to the active collector, if any."""
+
+    def execute(self, query, vars=None):
+        collector = _collector.get()
+        if collector is None:
+            return super().execute(query, vars)
+
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            collector.record_query(query, time.perf_counter() - start, self.rowcount)
+
+
+def start_collecting():
+    collector = QueryCollector()
+    return collector, _collector.set(collector)
+
+
+def stop_collecting(token):
+    try:
+        _collector.reset(token)
+    except ValueError:
+        # Stopped from another context, e.g. at the end of a streamed response
+        _collector.set(None)
+
+
+@contextmanager
+def collect_queries():
+    collector, token = start_collecting()
+    try:
+        yield collector
+    finally:
+        stop_collecting(token)
+
+
+def get_collector():
+    return _collector.get()
+
+
+# Makes `collector` the active one for code running in another thread or event loop
+@contextmanager
+def use_collector(collector):
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(token)
+
+
+# Called by repository.database around every connection checkout
+def record_connection(acquire_time):
+    collector = _collector.get()
+    if collector is not None:
+        collector.record_connection(acquire_time)
+
+
+# ------------------------------------------------------------
+# ------------------ aggregates across requests ----------------------
+# ------------------------------------------------------------
+
+_fingerprints_lock = threading.Lock()
+_fingerprints = {}
+
+
+def record_collected(collector):
+    with _fingerprints_lock:
+        for query_fingerprint, duration, rows in collector.queries:
+            stats = _fingerprints.get(query_fingerprint)
+            if stats is None:
+                if len(_fingerprints) >= MAX_FINGERPRINTS:
+                    continue
+                stats = _fingerprints[query_fingerprint] = {
+                    'count': 0, 'total_time': 0.0, 'max_time': 0.0, 'rows': 0
+                }
+            stats['count'] += 1
+            stats['total_time'] += duration
+            stats['max_time'] = max(stats['max_time'], duration)
+            stats['rows'] += max(rows, 0)
+
+
+# The `limit` fingerprints with the highest `order_by` ('total_time', 'max_time' or 'count')
+def get_slowest_fingerprints(limit=20, order_by='total_time'):
+    with _fingerprints_lock:
+        stats = [{'fingerprint': query_fingerprint, **values} for query_fingerprint, values in _fingerprints.items()]
+    for entry in stats:
+        entry['mean_time'] = entry['total_time'] / entry['count']
+    return sorted(stats, key=lambda entry: entry[order_by], reverse=True)[:limit]
+
+
+def reset_fingerprint_stats():
+    with _fingerprints_lock:
+        _fingerprints.clear()
@@ -24,3 +24,32 @@ def find_player_name_by_id(player_id):
         if result:
             return result['player_name']
         return None
+
+
+# {team_id: [player_id, ...]} for every existing team in `team_ids`, including teams without players
+def get_team_members(team_ids):
+    with db_connection() as cursor:
+        cursor.execute('''
+            SELECT t.id as team_id, tp.player_id
+            FROM teams t
+            LEFT JOIN team_players tp ON tp.team_id = t.id
+            WHERE t.id = ANY(%s)
+        ''', (list(team_ids),))
+
+        members = {}
+        for row in cursor.fetchall():
+            team_members = members.setdefault(row['team_id'], [])
+            if row['player_id'] is not None:
+                team_members.append(row['player_id'])
+        return members
+
+
+def get_team_roster(team_id):
+    with db_connection() as cursor:
+        cursor.execute('''
+            SELECT tp.player_id, p.player_name, tp.player_position
+            FROM team_players tp
+            JOIN players p ON tp.player_id = p.id
+            WHERE tp.team_id = %s;
+        ''', (team_id,))
+        return cursor.fetchall()
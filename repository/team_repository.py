@@ -1,31 +1,45 @@
 from models.team import Team
+from repository.aggregate_repository import FANTASY_TOTALS_COLUMNS, FANTASY_TOTALS_ON_CONFLICT
+from repository.data_version_repository import BUMP_DATA_VERSION, bump_data_version
 from repository.database import db_connection
-from repository.team_players_repository import find_player_name_by_id
 
 
+# Inserts the team, its players and its aggregate row, and bumps the data version, in a single statement.
+# Returns the team's ID and the data version the write produced.
 def create_new_team(team_name, players_with_positions):
     with db_connection() as cursor:
-
-        cursor.execute('''
+        cursor.execute(f'''
+            WITH new_team AS (
                 INSERT INTO teams (team_name)
-                VALUES (%s) RETURNING id
-            ''', (team_name,))
+                VALUES (%(team_name)s) RETURNING id
+            ), members AS (
+                INSERT INTO team_players (team_id, player_id, player_name, player_position)
+                SELECT new_team.id, m.player_id, m.player_name, m.player_position
+                FROM new_team,
+                     unnest(%(player_ids)s::int[], %(player_names)s::varchar[], %(positions)s::varchar[])
+                         AS m(player_id, player_name, player_position)
+            ), totals AS (
+                INSERT INTO fantasy_team_totals
+                SELECT new_team.id, {FANTASY_TOTALS_COLUMNS}
+                FROM new_team
+                LEFT JOIN player_career_totals ct ON ct.player_id = ANY(%(player_ids)s)
+                GROUP BY new_team.id
+            ), bumped AS (
+                {BUMP_DATA_VERSION}
+            )
+            SELECT new_team.id, bumped.version FROM new_team, bumped
+        ''', {
+            'team_name': team_name,
+            'player_ids': [player.player_id for player in players_with_positions],
+            'player_names': [player.player_name for player in players_with_positions],
+            'positions': [player.player_position for player in players_with_positions],
+        })
 
         result = cursor.fetchone()
         if not result:
             raise ValueError("Failed to create team.")
 
-        team_id = result['id']
-
-        for player in players_with_positions:
-            cursor.execute('''
-                    INSERT INTO team_players (team_id, player_id, player_name, player_position)
-                    VALUES (%s, %s, %s, %s)
-                ''', (team_id, player.player_id, player.player_name, player.player_position))
-
-        cursor.connection.commit()
-
-    return team_id
+    return result['id'], result['version']
 
 
 def get_team_by_name(team_name):
@@ -53,39 +67,91 @@ def get_team_by_id(team_id):
 
 
 
+# Everything a team write needs to validate, for all requested players, in one query:
+# each player's name, last-season position and membership of another team, plus whether the team
+# exists and whether its new name is already taken. Players come back in request order.
+def get_team_write_context(player_ids, team_name=None, team_id=None):
+    with db_connection() as cursor:
+        cursor.execute('''
+            SELECT 
+                req.player_id, p.player_name, pls.position,
+                other.team_id as other_team_id,
+                EXISTS (SELECT 1 FROM teams WHERE id = %(team_id)s) as team_exists,
+                EXISTS (
+                    SELECT 1 FROM teams WHERE team_name = %(team_name)s AND id IS DISTINCT FROM %(team_id)s
+                ) as name_taken
+            FROM unnest(%(player_ids)s::int[]) WITH ORDINALITY AS req(player_id, ord)
+            LEFT JOIN players p ON p.id = req.player_id
+            LEFT JOIN player_latest_season pls ON pls.player_id = req.player_id
+            LEFT JOIN LATERAL (
+                SELECT tp.team_id FROM team_players tp
+                WHERE tp.player_id = req.player_id AND tp.team_id IS DISTINCT FROM %(team_id)s
+                ORDER BY tp.team_id LIMIT 1
+            ) other ON true
+            ORDER BY req.ord
+        ''', {'player_ids': list(player_ids), 'team_name': team_name, 'team_id': team_id})
+
+        players = cursor.fetchall()
+
+    return {
+        "team_exists": bool(players) and players[0]['team_exists'],
+        "name_taken": bool(players) and players[0]['name_taken'],
+        "players": players,
+    }
+
+
+# Renames the team, replaces its players, refreshes its aggregate row and bumps the data version
+# in a single statement.
+# Returns the data version the write produced.
+# Raises ValueError (rolling everything back) when a player does not exist.
 def update_team(players_with_positions, team_id, name_team=None):
-    try:
-        with db_connection() as cursor:
-            # If a new team name is provided, update the team's name
-            if name_team:
-                cursor.execute('''
-                    UPDATE teams SET team_name = %s WHERE id = %s
-                ''', (name_team, team_id))
-
-            # First, delete the existing players in the team
-            cursor.execute('''
-                DELETE FROM team_players WHERE team_id = %s
-            ''', (team_id,))
-
-            # Insert the new players and their positions
-            for player_id, position in players_with_positions.items():
-                player_name = find_player_name_by_id(player_id)
-                if player_name is None:
-                    raise ValueError(f"Player with ID {player_id} not found")
+    player_ids = list(players_with_positions.keys())
 
-                cursor.execute('''
-                    INSERT INTO team_players (team_id, player_id, player_name, player_position)
-                    VALUES (%s, %s, %s, %s)
-                ''', (team_id, player_id, player_name, position))
+    with db_connection() as cursor:
+        cursor.execute(f'''
+            WITH renamed AS (
+                UPDATE teams SET team_name = %(team_name)s
+                WHERE id = %(team_id)s AND %(team_name)s IS NOT NULL
+            ), requested AS (
+                SELECT m.player_id, p.player_name, m.player_position
+                FROM unnest(%(player_ids)s::int[], %(positions)s::varchar[]) AS m(player_id, player_position)
+                JOIN players p ON p.id = m.player_id
+            ), removed AS (
+                DELETE FROM team_players
+                WHERE team_id = %(team_id)s AND player_id <> ALL(%(player_ids)s)
+            ), members AS (
+                INSERT INTO team_players (team_id, player_id, player_name, player_position)
+                SELECT %(team_id)s, player_id, player_name, player_position FROM requested
+                ON CONFLICT (team_id, player_id) DO UPDATE SET
+                    player_name = EXCLUDED.player_name, player_position = EXCLUDED.player_position
+            ), totals AS (
+                INSERT INTO fantasy_team_totals
+                SELECT %(team_id)s, {FANTASY_TOTALS_COLUMNS}
+                FROM player_career_totals ct
+                WHERE ct.player_id = ANY(%(player_ids)s)
+                {FANTASY_TOTALS_ON_CONFLICT}
+            ), bumped AS (
+                {BUMP_DATA_VERSION}
+            )
+            SELECT (SELECT array_agg(player_id) FROM requested) as found, bumped.version FROM bumped
+        ''', {
+            'team_id': team_id,
+            'team_name': name_team,
+            'player_ids': player_ids,
+            'positions': list(players_with_positions.values()),
+        })
 
-            cursor.connection.commit()
+        result = cursor.fetchone()
+        found = set(result['found'] or [])
+        for player_id in player_ids:
+            if player_id not in found:
+                raise ValueError(f"Player with ID {player_id} not found")
 
-    except Exception as e:
-        cursor.connection.rollback()
-        raise e
+    return result['version']
 
 
 
+# Returns the data version the write produced
 def delete_team(team_id):
     with db_connection() as cursor:
         cursor.execute('''
@@ -96,4 +162,4 @@ def delete_team(team_id):
             DELETE FROM teams WHERE id = %s
         ''', (team_id,))
 
-        cursor.connection.commit()
\ No newline at end of file
+        return bump_data_version()
@@ -0,0 +1,227 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from config.cache_config import CACHE_ENABLED, CACHE_TTL, CACHE_MAX_SIZE, CACHE_REDIS_URL, CACHE_KEY_PREFIX
+
+
+class LRUCache:
+    """In-process LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_size=CACHE_MAX_SIZE, ttl=CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedCacheBackend:
+    """Cache shared between processes, on top of a Redis-like client.
+
+    The client only needs ``get``, ``setex``, ``delete`` and ``scan_iter``.
+    """
+
+    def __init__(self, client, ttl=CACHE_TTL, key_prefix=CACHE_KEY_PREFIX):
+        self.client = client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    def get(self, key):
+        payload = self.client.get(self.key_prefix + key)
+        if payload is None:
+            return False, None
+        return True, pickle.loads(payload)
+
+    def set(self, key, value):
+        self.client.setex(self.key_prefix + key, max(int(self.ttl), 1), pickle.dumps(value))
+
+    def delete(self, key):
+        self.client.delete(self.key_prefix + key)
+
+    def delete_prefix(self, prefix):
+        keys = list(self.client.scan_iter(match=f'{self.key_prefix}{prefix}*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+# Namespaces of the cached service reads
+PLAYER_STATS = 'player_stats'
+TEAM_DETAILS = 'team_details'
+TEAM_STATS = 'team_stats'
+
+_local_cache = LRUCache()
+_shared_backend = None
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def configure_cache(shared_backend=None, max_size=CACHE_MAX_SIZE, ttl=CACHE_TTL):
+    global _local_cache, _shared_backend
+    _local_cache = LRUCache(max_size, ttl)
+    _shared_backend = shared_backend
+    reset_cache_stats()
+
+
+def _configure_from_env():
+    if CACHE_REDIS_URL:
+        import redis
+        configure_cache(SharedCacheBackend(redis.Redis.from_url(CACHE_REDIS_URL)))
+
+
+def _count(namespace, outcome, n=1):
+    with _stats_lock:
+        namespace_stats = _stats.setdefault(namespace, {'hits': 0, 'misses': 0})
+        namespace_stats[outcome] += n
+
+
+def get_cache_stats():
+    with _stats_lock:
+        stats = {namespace: dict(counts) for namespace, counts in _stats.items()}
+    hits = sum(counts['hits'] for counts in stats.values())
+    misses = sum(counts['misses'] for counts in stats.values())
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / (hits + misses) if hits + misses else None,
+        'size': len(_local_cache),
+        'namespaces': stats,
+    }
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def cache_key(namespace, *args, **kwargs):
+    return f"{namespace}:{args!r}:{sorted(kwargs.items())!r}"
+
+
+# Read-through cache for service functions; None results are never cached, so a missing
+# team that is created later is found straight away
+def cached(namespace):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not CACHE_ENABLED:
+                return function(*args, **kwargs)
+
+            key = cache_key(namespace, *args, **kwargs)
+            hit, value = _local_cache.get(key)
+            if not hit and _shared_backend is not None:
+                hit, value = _shared_backend.get(key)
+                if hit:
+                    _local_cache.set(key, value)
+            if hit:
+                _count(namespace, 'hits')
+                return value
+
+            _count(namespace, 'misses')
+            value = function(*args, **kwargs)
+            if value is not None:
+                _local_cache.set(key, value)
+                if _shared_backend is not None:
+                    _shared_backend.set(key, value)
+            return value
+
+        wrapper.uncached = function
+        return wrapper
+    return decorator
+
+
+# Read-through cache for batch lookups taking a list of keys and returning {key: value}.
+# Every key is cached on its own, so only the keys not seen yet reach the wrapped function.
+def cached_batch(namespace):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(keys):
+            keys = list(dict.fromkeys(keys))
+            if not CACHE_ENABLED:
+                return function(keys)
+
+            found = {}
+            missing = []
+            for key in keys:
+                entry_key = cache_key(namespace, key)
+                hit, value = _local_cache.get(entry_key)
+                if not hit and _shared_backend is not None:
+                    hit, value = _shared_backend.get(entry_key)
+                    if hit:
+                        _local_cache.set(entry_key, value)
+                if hit:
+                    found[key] = value
+                elif key not in missing:
+                    missing.append(key)
+
+            _count(namespace, 'hits', len(keys) - len(missing))
+            if missing:
+                _count(namespace, 'misses', len(missing))
+                for key, value in function(missing).items():
+                    found[key] = value
+                    _local_cache.set(cache_key(namespace, key), value)
+                    if _shared_backend is not None:
+                        _shared_backend.set(cache_key(namespace, key), value)
+            return found
+
+        wrapper.uncached = function
+        return wrapper
+    return decorator
+
+
+# Drops one entry (when arguments are given) or the whole namespace
+def invalidate(namespace, *args, **kwargs):
+    if args or kwargs:
+        key = cache_key(namespace, *args, **kwargs)
+        _local_cache.delete(key)
+        if _shared_backend is not None:
+            _shared_backend.delete(key)
+    else:
+        _local_cache.delete_prefix(f"{namespace}:")
+        if _shared_backend is not None:
+            _shared_backend.delete_prefix(f"{namespace}:")
+
+
+# Everything derived from player_seasons, after an ingestion run
+def invalidate_player_data():
+    for namespace in (PLAYER_STATS, TEAM_DETAILS, TEAM_STATS):
+        invalidate(namespace)
+
+
+_configure_from_env()
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from config.cache_config import DATA_VERSION_TTL
+from repository.data_version_repository import get_data_version
+from service.cache import invalidate_player_data
+from service.stats_snapshot import refresh_snapshot
+
+_lock = threading.Lock()
+_version = None
+_fetched_at = 0.0
+
+
+# Drops everything this process derived from player data
+def _drop_derived_data():
+    invalidate_player_data()
+    refresh_snapshot()
+
+
+# The data version, read at most once per DATA_VERSION_TTL. When it moved on (a write in any
+# process), everything this process derived from older data is dropped first.
+def current_data_version():
+    global _version, _fetched_at
+    if _version is not None and time.monotonic() - _fetched_at < DATA_VERSION_TTL:
+        return _version
+
+    with _lock:
+        version = get_data_version()
+        if _version is not None and version != _version:
+            _drop_derived_data()
+        _version, _fetched_at = version, time.monotonic()
+    return version
+
+
+# After a write in this process, with the version its own bump produced. The write already dropped
+# what it made stale, so when its bump is the only change since the last read the version is just
+# taken; any other version means writes elsewhere came in between, and those are handled like
+# any foreign change.
+def note_data_version(version):
+    global _version, _fetched_at
+    with _lock:
+        if _version is not None and version <= _version:
+            # A newer version was taken meanwhile, after this write committed
+            return
+        if _version is None or version != _version + 1:
+            _drop_derived_data()
+        _version, _fetched_at = version, time.monotonic()
+
+
+# After writes too broad to track, like an ingestion: drops everything and starts over from
+# the version read now
+def reset_data_version():
+    global _version, _fetched_at
+    with _lock:
+        version = get_data_version()
+        _drop_derived_data()
+        _version, _fetched_at = version, time.monotonic()
@@ -0,0 +1,47 @@
+try:
+    import numpy as np
+except ImportError:  # only the array functions need numpy
+    np = None
+
+
+# Every derived stat is a ratio, undefined (None, or NaN in arrays) when the denominator is
+# zero or missing. The SQL equivalent is `numerator / NULLIF(denominator, 0)`.
+
+def ratio(numerator, denominator):
+    if numerator is None or not denominator:
+        return None
+    return numerator / denominator
+
+
+# Assist to turnover ratio
+def calculate_atr(assists, turnovers):
+    return ratio(assists, turnovers)
+
+
+# Points per game
+def calculate_ppg(points, games):
+    return ratio(points, games)
+
+
+# ------------------------------------------------------------
+# ------------------ whole result sets ----------------------
+# ------------------------------------------------------------
+
+def ratio_array(numerators, denominators):
+    numerators = np.asarray(numerators, dtype=np.float64)
+    denominators = np.asarray(denominators, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominators != 0, numerators / denominators, np.nan)
+
+
+def atr_array(assists, turnovers):
+    return ratio_array(assists, turnovers)
+
+
+def ppg_array(points, games):
+    return ratio_array(points, games)
+
+
+# NaN back to None, for JSON
+def to_nullable_list(values):
+    return np.where(np.isnan(values), None, values).tolist()
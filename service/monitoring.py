@@ -0,0 +1,120 @@
+import os
+
+from repository.database import get_pool_stats
+from service.cache import get_cache_stats
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST, \
+        generate_latest, multiprocess
+except ImportError:  # metrics are optional; every function below becomes a no-op
+    Counter = None
+
+METRICS_AVAILABLE = Counter is not None
+# Set by the WSGI server setup when several worker processes share one /metrics view
+MULTIPROCESS = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+POOL_STATES = ('size', 'idle', 'in_use')
+POOL_TOTALS = ('checkouts', 'exhausted', 'timeouts', 'connections_created', 'connections_discarded')
+
+if METRICS_AVAILABLE:
+    REQUEST_LATENCY = Histogram(
+        'nba_http_request_duration_seconds', "Latency of HTTP requests by route",
+        ['method', 'route', 'status'],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+    REQUESTS_IN_FLIGHT = Gauge(
+        'nba_http_requests_in_flight', "Requests being handled", multiprocess_mode='livesum')
+
+    # Pool and cache figures are per process; `livesum` adds up the workers that are alive
+    DB_POOL_CONNECTIONS = Gauge(
+        'nba_db_pool_connections', "Pooled database connections by state", ['state'],
+        multiprocess_mode='livesum')
+    DB_POOL_EVENTS = Gauge(
+        'nba_db_pool_events', "Pool events since each worker started", ['event'], multiprocess_mode='livesum')
+    DB_POOL_WAIT = Gauge(
+        'nba_db_pool_wait_seconds', "Seconds spent waiting for a pooled connection since each worker started",
+        multiprocess_mode='livesum')
+    CACHE_LOOKUPS = Gauge(
+        'nba_cache_lookups', "Service cache lookups since each worker started; "
+        "hit ratio = hits / (hits + misses)", ['namespace', 'outcome'], multiprocess_mode='livesum')
+
+    FETCH_EVENTS = Counter(
+        'nba_fetch_events', "NBA API fetches: pages_fetched, rows_fetched, retries, failed_pages", ['event'])
+    INGEST_ROWS = Counter(
+        'nba_ingest_rows', "Rows written by ingestion, by outcome", ['outcome'])
+    INGEST_PAGES = Counter(
+        'nba_ingest_pages', "API pages processed by ingestion")
+    INGEST_SECONDS = Counter(
+        'nba_ingest_seconds', "Time spent in ingestion runs; rows/s = rate(rows) / rate(seconds)")
+    INGEST_LAST_ROWS_PER_SECOND = Gauge(
+        'nba_ingest_last_run_rows_per_second', "Throughput of the latest ingestion run",
+        multiprocess_mode='mostrecent')
+
+
+def observe_request(method, route, status, seconds):
+    if METRICS_AVAILABLE:
+        REQUEST_LATENCY.labels(method, route, str(status)).observe(seconds)
+
+
+def request_started():
+    if METRICS_AVAILABLE:
+        REQUESTS_IN_FLIGHT.inc()
+
+
+def request_finished():
+    if METRICS_AVAILABLE:
+        REQUESTS_IN_FLIGHT.dec()
+
+
+# Copies this process's pool and cache statistics into their gauges
+def update_process_gauges():
+    if not METRICS_AVAILABLE:
+        return
+
+    pool_stats = get_pool_stats()
+    if pool_stats is not None:
+        for state in POOL_STATES:
+            DB_POOL_CONNECTIONS.labels(state).set(pool_stats[state])
+        for event in POOL_TOTALS:
+            DB_POOL_EVENTS.labels(event).set(pool_stats[event])
+        DB_POOL_WAIT.set(pool_stats['wait_time_total'])
+
+    for namespace, counts in get_cache_stats()['namespaces'].items():
+        for outcome in ('hits', 'misses'):
+            CACHE_LOOKUPS.labels(namespace, outcome).set(counts[outcome])
+
+
+def record_fetch(**increments):
+    if METRICS_AVAILABLE:
+        for event, value in increments.items():
+            FETCH_EVENTS.labels(event).inc(value)
+
+
+def record_ingested_page(page_result):
+    if METRICS_AVAILABLE:
+        INGEST_PAGES.inc()
+        for outcome in ('inserted', 'updated', 'skipped'):
+            INGEST_ROWS.labels(outcome).inc(page_result[outcome])
+
+
+def record_ingest_run(rows, seconds):
+    if METRICS_AVAILABLE:
+        INGEST_SECONDS.inc(seconds)
+        if seconds > 0:
+            INGEST_LAST_ROWS_PER_SECOND.set(rows / seconds)
+
+
+# (body, content type) of the Prometheus text exposition, across workers in multiprocess mode
+def render_metrics():
+    update_process_gauges()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# For the WSGI server's child_exit hook, so a dead worker's live gauges are dropped
+def mark_process_dead(pid):
+    if METRICS_AVAILABLE and MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
@@ -1,52 +1,73 @@
-from repository.player_season_repository import get_player_by_position
+from repository.player_season_repository import get_player_by_position, iter_player_by_position
+from service.cache import cached, PLAYER_STATS
+from service.request_memo import memoized_per_request
+from service.stats_snapshot import get_snapshot
 
 
 
-# 1. function that get from the db all player base on the position
-def filter_players_by_season(players, seasons):
-    if not seasons:
-        return players
-    if len(seasons) == 1:
-        return [player for player in players if player[3] == seasons[0]]
-    return players
+# 1. normalize the season filter: a single season or a list of seasons
+def normalize_seasons(seasons):
+    if seasons is None:
+        return None
+    if isinstance(seasons, int):
+        return [seasons]
+    return list(seasons) or None
 
 
-# 2. function that filter if the user send a season too
+# ATR and PPG come computed with the rows (see service/derived_stats.py)
+def to_player_stats(player):
+    return {
+        "playerName": player['player_name'],
+        "team": player['team'],
+        "season": player['season'],
+        "points": player['points'],
+        "games": player['games'],
+        "twoPercent": player['two_percent'],
+        "threePercent": player['three_percent'],
+        "ATR": player['atr'],
+        "PPG": player['ppg']
+    }
 
-# 3. calc art
-def calculate_atr(assists, turnovers):
-    if turnovers == 0:
-        return None
-    return assists / turnovers
 
-# 4. calc ppg
-def calculate_ppg(points, games):
-    if games == 0:
-        return 0
-    return points / games
+@memoized_per_request
+@cached(PLAYER_STATS)
+def main_calc(position, seasons=None, team=None):
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return snapshot.player_stats(position, normalize_seasons(seasons), team)
+
+    # Season and team filtering happen in SQL
+    players = get_player_by_position(position, normalize_seasons(seasons), team)
+    return [to_player_stats(player) for player in players]
+
+
+# ------------------------------------------------------------
+# ------------------ pagination / streaming ----------------------
+# ------------------------------------------------------------
+
+# Page cursors are "<season>:<player id>" of the last row of the previous page
+def encode_cursor(player):
+    return f"{player['season']}:{player['id']}"
+
 
+def decode_cursor(cursor):
+    season, player_id = cursor.split(':')
+    return int(season), int(player_id)
 
-def main_calc(position, seasons):
-    player_by_position = get_player_by_position(position)
 
-    filtered_players = filter_players_by_season(player_by_position, seasons)
+def get_players_page(position, seasons=None, team=None, limit=100, after=None):
+    # One extra row tells whether there is a next page
+    players = get_player_by_position(position, normalize_seasons(seasons), team, limit + 1,
+                                     decode_cursor(after) if after else None)
 
-    result = []
-    for player in filtered_players:
+    next_cursor = None
+    if len(players) > limit:
+        players = players[:limit]
+        next_cursor = encode_cursor(players[-1])
 
-        atr = calculate_atr(player['assists'], player['turnovers'])
-        ppg = calculate_ppg(player['points'], player['games'])
+    return {"players": [to_player_stats(player) for player in players], "next": next_cursor}
 
-        result.append({
-            "playerName": player['player_name'],
-            "team": player['team'],
-            "season": player['season'],
-            "points": player['points'],
-            "games": player['games'],
-            "twoPercent": player['two_percent'],
-            "threePercent": player['three_percent'],
-            "ATR": atr,
-            "PPG": ppg
-        })
 
-    return result
\ No newline at end of file
+def stream_players(position, seasons=None, team=None):
+    for player in iter_player_by_position(position, normalize_seasons(seasons), team):
+        yield to_player_stats(player)
@@ -0,0 +1,78 @@
+import argparse
+
+from psycopg2.extras import RealDictCursor
+
+from repository.database import get_db_connection, use_connection
+from repository.player_season_repository import get_player_by_position, get_latest_positions
+from repository.team_players_repository import find_team_player_by_id
+from repository.team_repository import get_team_by_name, get_team_by_id, get_team_write_context
+from service.team_service import get_team_stats_by_name, get_team_details, \
+    get_teams_comparison_details
+
+
+# Read paths to report on, called with representative arguments (bypassing the service cache)
+REPOSITORY_QUERIES = {
+    'get_player_by_position': lambda: get_player_by_position('PG'),
+    'get_latest_positions': lambda: get_latest_positions([1, 2, 3]),
+    'find_team_player_by_id': lambda: find_team_player_by_id(1),
+    'get_team_by_name': lambda: get_team_by_name('Lakers'),
+    'get_team_by_id': lambda: get_team_by_id(1),
+    'get_team_stats_by_name': lambda: get_team_stats_by_name.uncached('LAL'),
+    'get_team_details': lambda: get_team_details.uncached(1),
+    'get_teams_comparison_details': lambda: get_teams_comparison_details([1, 2, 3]),
+    'get_team_write_context': lambda: get_team_write_context([1, 2, 3, 4, 5], 'Lakers', 1),
+}
+
+
+# Records the plan of every statement before running it, so the calling code behaves as usual
+class ExplainCursor(RealDictCursor):
+    analyze = False
+    plans = None
+
+    def execute(self, query, vars=None):
+        options = '(ANALYZE, BUFFERS) ' if self.analyze else ''
+        super().execute(f'EXPLAIN {options}{query}', vars)
+        self.plans.append('\n'.join(row['QUERY PLAN'] for row in self.fetchall()))
+        return super().execute(query, vars)
+
+
+# Returns {query name: [plan of each statement it ran]}; everything is rolled back afterwards
+def explain_queries(names=None, analyze=False):
+    connection = get_db_connection()
+    reports = {}
+    try:
+        for name in names or REPOSITORY_QUERIES:
+            plans = []
+            cursor_factory = type('BoundExplainCursor', (ExplainCursor,), {'analyze': analyze, 'plans': plans})
+            connection.cursor_factory = cursor_factory
+            with use_connection(connection):
+                try:
+                    REPOSITORY_QUERIES[name]()
+                except Exception as e:
+                    # The plans are recorded before execution, so keep whatever was captured
+                    plans.append(f"(stopped: {e!r})")
+            reports[name] = plans
+    finally:
+        connection.rollback()
+        connection.close()
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the EXPLAIN plan of every repository query")
+    parser.add_argument('names', nargs='*', help=f"queries to explain (default: all of {', '.join(REPOSITORY_QUERIES)})")
+    parser.add_argument('--analyze', action='store_true', help="run EXPLAIN ANALYZE instead of EXPLAIN")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in REPOSITORY_QUERIES]
+    if unknown:
+        parser.error(f"unknown queries: {', '.join(unknown)}")
+
+    for name, plans in explain_queries(args.names, args.analyze).items():
+        print(f"=== {name}")
+        for plan in plans:
+            print(plan)
+            print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import threading
+from functools import wraps
+
+from flask import request, has_request_context
+
+from repository.query_instrumentation import get_collector
+from service.cache import cache_key
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'saved_queries': 0}
+
+
+# Kept in the WSGI environ rather than `g`: `g` lives as long as the app context, which Flask
+# reuses for every request pushed inside an already active one (`with app.app_context():`)
+_MEMO_KEY = 'nba.request_memo'
+_STATS_KEY = 'nba.request_memo_stats'
+
+
+def _new_request_stats():
+    return {'hits': 0, 'misses': 0, 'saved_queries': 0}
+
+
+def _record(outcome, saved_queries=0):
+    request_stats = request.environ.setdefault(_STATS_KEY, _new_request_stats())
+    request_stats[outcome] += 1
+    request_stats['saved_queries'] += saved_queries
+    with _stats_lock:
+        _stats[outcome] += 1
+        _stats['saved_queries'] += saved_queries
+
+
+# Remembers the results of a read for the rest of the request, so repeating the same
+# lookup in one request is free. A hit counts the statements the first call ran as saved.
+# Outside a request the function is simply called.
+def memoized_per_request(function):
+    name = f"{function.__module__}.{function.__qualname__}"
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not has_request_context():
+            return function(*args, **kwargs)
+
+        memo = request.environ.setdefault(_MEMO_KEY, {})
+        key = cache_key(name, *args, **kwargs)
+        if key in memo:
+            value, queries = memo[key]
+            _record('hits', queries)
+            return value
+
+        collector = get_collector()
+        queries_before = collector.count if collector is not None else 0
+        value = function(*args, **kwargs)
+        queries = collector.count - queries_before if collector is not None else 0
+        memo[key] = (value, queries)
+        _record('misses')
+        return value
+
+    return wrapper
+
+
+# After a write in the request, so later reads see it
+def clear_request_memo():
+    if has_request_context():
+        request.environ.pop(_MEMO_KEY, None)
+
+
+# Hits, misses and saved statements of the current request
+def get_request_memo_stats():
+    if not has_request_context():
+        return _new_request_stats()
+    return dict(request.environ.get(_STATS_KEY) or _new_request_stats())
+
+
+# Totals across requests
+def get_memo_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_memo_stats():
+    with _stats_lock:
+        for counter in _stats:
+            _stats[counter] = 0
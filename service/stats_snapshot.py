@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+
+import psycopg2
+
+from config.cache_config import STATS_SNAPSHOT_ENABLED, STATS_SNAPSHOT_TTL
+from repository.player_season_repository import get_all_player_seasons
+from service.derived_stats import calculate_atr, calculate_ppg, atr_array, ppg_array, to_nullable_list
+
+try:
+    import numpy as np
+except ImportError:  # the snapshot is optional; every read falls back to the database
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(values):
+    # Dictionary encoding: the distinct values, and each row's index into them
+    categories, codes = np.unique(np.array(values, dtype=object).astype(str), return_inverse=True)
+    return {category: code for code, category in enumerate(categories.tolist())}, codes.astype(np.int32)
+
+
+def _sum(values):
+    # SQL SUM semantics: NULLs are skipped, and the sum of nothing but NULLs is NULL
+    if not np.any(~np.isnan(values)):
+        return None
+    return float(np.nansum(values))
+
+
+def _average(values):
+    present = values[~np.isnan(values)]
+    if not present.size:
+        return None
+    return float(present.sum() / present.size)
+
+
+def _group_sums(keys, columns):
+    # Group-by over the column arrays: the sorted distinct keys and, per column, each group's sum
+    # of present values and their count (SQL SUM and AVG skip NULLs)
+    order = np.argsort(keys, kind='stable')
+    group_keys, starts = np.unique(keys[order], return_index=True)
+    sums = {}
+    for name, values in columns.items():
+        if not group_keys.size:
+            sums[name] = (np.zeros(0, dtype=values.dtype), np.zeros(0, dtype=np.int64))
+            continue
+        values = values[order]
+        present = ~np.isnan(values) if values.dtype.kind == 'f' else np.ones(values.size, dtype=bool)
+        sums[name] = (np.add.reduceat(np.where(present, values, 0), starts),
+                      np.add.reduceat(present.astype(np.int64), starts))
+    return group_keys, sums
+
+
+class StatsSnapshot:
+    """Column arrays of player_seasons, ordered by (season, player_id) like the position query."""
+
+    def __init__(self, rows):
+        self.loaded_at = time.monotonic()
+        self.size = len(rows)
+
+        def column(name, dtype):
+            return np.array([np.nan if row[name] is None else row[name] for row in rows], dtype=dtype)
+
+        self.player_id = column('player_id', np.int64)
+        self.player_name = np.array([row['player_name'] for row in rows], dtype=object)
+        self.season = column('season', np.int64)
+        self.points = column('points', np.int64)
+        self.games = column('games', np.int64)
+        self.two_percent = column('two_percent', np.float64)
+        self.three_percent = column('three_percent', np.float64)
+        self.assists = column('assists', np.float64)
+        self.turnovers = column('turnovers', np.float64)
+        self.positions, self.position_codes = _encode([row['position'] for row in rows])
+        self.teams, self.team_codes = _encode([row['team'] for row in rows])
+        self.team_names = np.array(list(self.teams), dtype=object)
+        # Career sums of every player, grouped once per load
+        self.career_player_ids, self.career_sums = _group_sums(self.player_id, {
+            'points': self.points, 'games': self.games, 'two_percent': self.two_percent,
+            'three_percent': self.three_percent, 'assists': self.assists, 'turnovers': self.turnovers,
+        })
+
+    def _code_mask(self, codes, categories, value):
+        code = categories.get(value)
+        if code is None:
+            return np.zeros(self.size, dtype=bool)
+        return codes == code
+
+    # Same rows and figures as main_calc's database path
+    def player_stats(self, position, seasons=None, team=None):
+        mask = self._code_mask(self.position_codes, self.positions, position)
+        if seasons:
+            mask &= np.isin(self.season, list(seasons))
+        if team:
+            mask &= self._code_mask(self.team_codes, self.teams, team)
+        rows = np.flatnonzero(mask)
+
+        points, games = self.points[rows], self.games[rows]
+        atr = atr_array(self.assists[rows], self.turnovers[rows])
+        ppg = ppg_array(points, games)
+
+        team_names = self.team_names[self.team_codes[rows]]
+        return [
+            {
+                "playerName": player_name,
+                "team": team_name,
+                "season": season,
+                "points": player_points,
+                "games": player_games,
+                "twoPercent": two_percent,
+                "threePercent": three_percent,
+                "ATR": player_atr,
+                "PPG": player_ppg
+            }
+            for player_name, team_name, season, player_points, player_games, two_percent, three_percent,
+            player_atr, player_ppg in zip(
+                self.player_name[rows].tolist(), team_names.tolist(), self.season[rows].tolist(),
+                points.tolist(), games.tolist(), to_nullable_list(self.two_percent[rows]),
+                to_nullable_list(self.three_percent[rows]), to_nullable_list(atr), to_nullable_list(ppg)
+            )
+        ]
+
+    # Totals over the selected rows, with the column names of the aggregate tables' queries
+    def _totals(self, mask):
+        if not mask.any():
+            return {
+                "total_points": None, "total_games": None, "avg_two_percent": None,
+                "avg_three_percent": None, "total_assists": None, "total_turnovers": None,
+                "atr": None, "ppg_ratio": None,
+            }
+        totals = {
+            "total_points": int(self.points[mask].sum()),
+            "total_games": int(self.games[mask].sum()),
+            "avg_two_percent": _average(self.two_percent[mask]),
+            "avg_three_percent": _average(self.three_percent[mask]),
+            "total_assists": _sum(self.assists[mask]),
+            "total_turnovers": _sum(self.turnovers[mask]),
+        }
+        totals['atr'] = calculate_atr(totals['total_assists'], totals['total_turnovers'])
+        totals['ppg_ratio'] = calculate_ppg(totals['total_points'], totals['total_games'])
+        return totals
+
+    # {player_id: career totals} for the given players that have at least one season,
+    # looked up in the grouped career sums
+    def career_totals(self, player_ids):
+        player_ids = list(player_ids)
+        if not player_ids or not self.career_player_ids.size:
+            return {}
+        groups = np.searchsorted(self.career_player_ids, player_ids)
+        groups[groups == self.career_player_ids.size] = 0
+        found = self.career_player_ids[groups] == player_ids
+
+        def total(name, group):
+            values, counts = self.career_sums[name]
+            return values[group].item() if counts[group] else None
+
+        def average(name, group):
+            values, counts = self.career_sums[name]
+            return float(values[group] / counts[group]) if counts[group] else None
+
+        totals = {}
+        for player_id, group, is_found in zip(player_ids, groups.tolist(), found.tolist()):
+            if not is_found:
+                continue
+            player_totals = {
+                "total_points": total('points', group),
+                "total_games": total('games', group),
+                "avg_two_percent": average('two_percent', group),
+                "avg_three_percent": average('three_percent', group),
+                "total_assists": total('assists', group),
+                "total_turnovers": total('turnovers', group),
+            }
+            player_totals['atr'] = calculate_atr(player_totals['total_assists'], player_totals['total_turnovers'])
+            player_totals['ppg_ratio'] = calculate_ppg(player_totals['total_points'], player_totals['total_games'])
+            totals[player_id] = player_totals
+        return totals
+
+    # Totals of a fantasy team over its members' careers (like fantasy_team_totals)
+    def fantasy_team_totals(self, player_ids):
+        return self._totals(np.isin(self.player_id, list(player_ids)))
+
+    # Totals of an NBA team over all its seasons (like team_season_totals), None when unknown
+    def team_totals(self, team):
+        mask = self._code_mask(self.team_codes, self.teams, team)
+        if not mask.any():
+            return None
+        return self._totals(mask)
+
+
+_snapshot = None
+_reload_lock = threading.Lock()
+
+
+def load_snapshot():
+    global _snapshot
+    if np is None:
+        return None
+    try:
+        _snapshot = StatsSnapshot(get_all_player_seasons())
+    except psycopg2.Error:
+        logger.warning("Stats snapshot not loaded, reading from the database", exc_info=True)
+        return None
+    return _snapshot
+
+
+# At startup, when enabled in the configuration
+def init_snapshot():
+    if STATS_SNAPSHOT_ENABLED:
+        load_snapshot()
+
+
+# The loaded snapshot, reloaded once older than STATS_SNAPSHOT_TTL; None when not in use
+def get_snapshot():
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - snapshot.loaded_at > STATS_SNAPSHOT_TTL:
+        with _reload_lock:
+            if _snapshot is snapshot:
+                load_snapshot()
+        snapshot = _snapshot
+    return snapshot
+
+
+# After ingestion; a process that does not use the snapshot does not start loading one
+def refresh_snapshot():
+    if _snapshot is not None:
+        load_snapshot()
+
+
+def clear_snapshot():
+    global _snapshot
+    _snapshot = None
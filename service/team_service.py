@@ -1,68 +1,41 @@
-from toolz import pipe
-from toolz.curried import partial
-
 from models.teamPlayer import TeamPlayer
+from repository.async_database import async_queries_enabled, run_async, gather, fetch, fetchrow
 from repository.database import db_connection
-from repository.player_repository import get_player_name_by_id
-from repository.team_players_repository import find_team_player_by_id
-from repository.team_repository import create_new_team, get_team_by_name, update_team
+from repository.team_players_repository import get_team_members, get_team_roster
+from repository.team_repository import create_new_team, update_team, delete_team, get_team_write_context
+from service.cache import cached, cached_batch, invalidate, TEAM_DETAILS, TEAM_STATS
+from service.data_version import note_data_version
+from service.request_memo import memoized_per_request, clear_request_memo
+from service.stats_snapshot import get_snapshot
 
 
 REQUIRED_POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C']
 
 
-# Function to get all player names from the database in a single call
-def get_all_player_names(player_ids):
-    player_names = {}
-    for player_id in player_ids:
-        player_name = get_player_name_by_id(player_id)
-        if player_name:
-            player_names[player_id] = player_name
-    return player_names
-
-
-def get_last_season_position(player_id):
-    with db_connection() as cursor:
-        cursor.execute('''
-            SELECT position 
-            FROM player_seasons 
-            WHERE player_id = %s 
-            ORDER BY season DESC LIMIT 1;
-        ''', (player_id,))
-        result = cursor.fetchone()
-        if result:
-            return result['position']
-        return None
-
+class TeamNotFoundError(Exception):
+    pass
 
-def main_create_team(team_name, data):
-    print(team_name)
-    print(data)
-    check_if_team_name_exist = get_team_by_name(team_name)
-    if check_if_team_name_exist is not None:
-        return None
 
-    player_ids = data.keys()
+# Builds the TeamPlayer list from get_team_write_context, positioning every player by
+# their last season. Raises ValueError when the players cannot make up a team.
+def prepare_team_players(context):
+    players = context['players']
 
-    if len(player_ids) != len(REQUIRED_POSITIONS):
+    if len(players) != len(REQUIRED_POSITIONS):
         raise ValueError("Exactly 5 players are required to create a team.")
 
-    # Fetch all player names by player IDs
-    player_names = get_all_player_names(player_ids)
-
-    if len(player_names) != len(player_ids):
-        raise ValueError("One or more players could not be found in the database.")
-
-    # Map positions automatically
     team_players = []
-    for i, player_id in enumerate(player_ids):
-        player_name = player_names.get(player_id)
-        if player_name:
-            team_players.append(TeamPlayer(
-                player_id=player_id,
-                player_name=player_name,
-                player_position=REQUIRED_POSITIONS[i]  # Assign position based on order
-            ))
+    for player in players:
+        if player['player_name'] is None:
+            raise ValueError(f"Player with ID {player['player_id']} not found")
+        position = player['position']
+        if position is None:
+            raise ValueError(f"Player with ID {player['player_id']} has no data for the last season")
+        team_players.append(TeamPlayer(
+            player_id=player['player_id'],
+            player_name=player['player_name'],
+            player_position=position
+        ))
 
     # Validate that all required positions are covered
     positions_in_team = [player.player_position for player in team_players]
@@ -71,42 +44,62 @@ def main_create_team(team_name, data):
     if missing_positions:
         raise ValueError(f"Missing players for positions: {', '.join(missing_positions)}")
 
-    # Insert the team into the database
-    team_id = create_new_team(team_name, team_players)
+    return team_players
+
+
+# Returns the new team's ID, or None when the name is already taken.
+# One query validates the request, one statement writes the team.
+def main_create_team(team_name, player_ids):
+    context = get_team_write_context(player_ids, team_name=team_name)
+    team_players = prepare_team_players(context)
+
+    if context['name_taken']:
+        return None
+
+    team_id, version = create_new_team(team_name, team_players)
+    note_data_version(version)
+    clear_request_memo()
     return team_id
 
 
 # ------------------------------------------------------------
 # ------------------ update team ----------------------
 # ------------------------------------------------------------
-def validate_team_players(players_with_positions, team_id):
-    player_ids = list(players_with_positions.keys())
-    check_players = pipe(
-        player_ids,
-        partial(map, find_team_player_by_id),
-        list
-    )
-
-    existing_players = [
-        player for player in check_players
-        if player is not None and player['team_id'] != team_id
+def format_players_in_other_teams(context):
+    return [
+        f"{player['player_name']} (Player ID: {player['player_id']}, Team ID: {player['other_team_id']})"
+        for player in context['players']
+        if player['other_team_id'] is not None
     ]
 
-    if existing_players:
-        formatted_existing_players = [
-            f"{player['player_name']} (Player ID: {player['player_id']}, Team ID: {player['team_id']})"
-            for player in existing_players
-        ]
-        return formatted_existing_players
 
-    return None
+def update_team_players(team_id, player_ids, name_team=None):
+    context = get_team_write_context(player_ids, team_name=name_team, team_id=team_id)
+    if not context['team_exists']:
+        raise TeamNotFoundError(f"Team with ID {team_id} does not exist")
+
+    team_players = prepare_team_players(context)
+
+    # Validate that no player belongs to another team
+    existing_players = format_players_in_other_teams(context)
+    if existing_players:
+        raise ValueError(f"Players already in other teams: {', '.join(existing_players)}")
 
+    if context['name_taken']:
+        raise ValueError("This team name already exists, please choose another")
 
+    players_with_positions = {player.player_id: player.player_position for player in team_players}
+    version = update_team(players_with_positions, team_id, name_team)
+    invalidate(TEAM_DETAILS, team_id)
+    note_data_version(version)
+    clear_request_memo()
 
 
-def update_team_players(team_id, players_with_positions, name_team=None):
-    update = update_team(players_with_positions, team_id, name_team)
-    return update
+def delete_team_by_id(team_id):
+    version = delete_team(team_id)
+    invalidate(TEAM_DETAILS, team_id)
+    note_data_version(version)
+    clear_request_memo()
 
 
 
@@ -115,32 +108,51 @@ def update_team_players(team_id, players_with_positions, name_team=None):
 # ------------------ show team ----------------------
 # ------------------------------------------------------------
 
+TEAM_NAME_QUERY = '''
+    SELECT team_name FROM teams WHERE id = %s;
+'''
+
+# Career totals are maintained in player_career_totals, so this is a primary-key join
+TEAM_ROSTER_QUERY = '''
+    SELECT 
+        p.player_name, tp.player_position, 
+        ct.total_points, 
+        ct.total_games,
+        ct.two_percent_sum / NULLIF(ct.two_percent_count, 0) as avg_two_percent,
+        ct.three_percent_sum / NULLIF(ct.three_percent_count, 0) as avg_three_percent,
+        ct.total_assists,
+        ct.total_turnovers,
+        ct.total_assists / NULLIF(ct.total_turnovers, 0) as atr,
+        ct.total_points::float / NULLIF(ct.total_games, 0) as ppg_ratio
+    FROM team_players tp
+    JOIN players p ON tp.player_id = p.id
+    JOIN player_career_totals ct ON ct.player_id = tp.player_id
+    WHERE tp.team_id = %s;
+'''
+
+
+@memoized_per_request
+@cached(TEAM_DETAILS)
 def get_team_details(team_id):
+    # Name and roster are independent lookups; with the async driver they run concurrently
+    if async_queries_enabled() and get_snapshot() is None:
+        team_result, players = run_async(gather(fetchrow(TEAM_NAME_QUERY, team_id),
+                                                fetch(TEAM_ROSTER_QUERY, team_id)))
+        return get_the_current_detail(players, team_result['team_name']) if team_result else None
+
     with db_connection() as cursor:
-        cursor.execute('''
-            SELECT team_name FROM teams WHERE id = %s;
-        ''', (team_id,))
+        cursor.execute(TEAM_NAME_QUERY, (team_id,))
         team_result = cursor.fetchone()
         if not team_result:
             return None
 
         team_name = team_result['team_name']
 
-        cursor.execute('''
-            SELECT 
-                p.player_name, tp.player_position, 
-                SUM(ps.points) as total_points, 
-                SUM(ps.games) as total_games,
-                AVG(ps.two_percent) as avg_two_percent,
-                AVG(ps.three_percent) as avg_three_percent,
-                SUM(ps.assists) as total_assists,
-                SUM(ps.turnovers) as total_turnovers
-            FROM team_players tp
-            JOIN players p ON tp.player_id = p.id
-            JOIN player_seasons ps ON p.id = ps.player_id
-            WHERE tp.team_id = %s
-            GROUP BY p.player_name, tp.player_position;
-        ''', (team_id,))
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            return get_the_current_detail(roster_with_career_totals(snapshot, team_id), team_name)
+
+        cursor.execute(TEAM_ROSTER_QUERY, (team_id,))
 
         players = cursor.fetchall()
         return get_the_current_detail(players, team_name)
@@ -148,12 +160,20 @@ def get_team_details(team_id):
 
 
 
+# Roster rows of the team joined with their career totals from the snapshot
+def roster_with_career_totals(snapshot, team_id):
+    roster = get_team_roster(team_id)
+    career_totals = snapshot.career_totals(player['player_id'] for player in roster)
+    return [
+        {**player, **career_totals[player['player_id']]}
+        for player in roster if player['player_id'] in career_totals
+    ]
+
+
+# Rows carry their derived stats (atr, ppg_ratio), computed in SQL or by the snapshot
 def get_the_current_detail(players, team_name):
     player_stats = []
     for player in players:
-        atr = calculate_atr(player['total_assists'], player['total_turnovers'])
-        ppg_ratio = calculate_ppg_ratio(player['total_points'], player['total_games'])
-
         player_stats.append({
             "playerName": player['player_name'],
             "position": player['player_position'],
@@ -161,8 +181,8 @@ def get_the_current_detail(players, team_name):
             "games": player['total_games'],
             "twoPercent": player['avg_two_percent'],
             "threePercent": player['avg_three_percent'],
-            "ATR": atr,
-            "PPG Ratio": ppg_ratio
+            "ATR": player['atr'],
+            "PPG Ratio": player['ppg_ratio']
         })
 
     return {
@@ -170,107 +190,127 @@ def get_the_current_detail(players, team_name):
         "players": player_stats
     }
 
-def calculate_atr(assists, turnovers):
-    if turnovers == 0:
-        return None
-    return assists / turnovers
-
-
-def calculate_ppg_ratio(points, games):
-    if games == 0:
-        return 0
-    return points / games
-
-
-
 # ------------------------------------------------------------
 # ------------------ compare teams ----------------------
 # ------------------------------------------------------------
 
-def get_team_comparison_details(team_id):
+def to_team_comparison(team_id, result):
+    return {
+        "team_id": team_id,
+        "points": result['total_points'],
+        "twoPercent": result['avg_two_percent'],
+        "threePercent": result['avg_three_percent'],
+        "ATR": result['atr'],
+        "PPG Ratio": result['ppg_ratio']
+    }
+
+
+# Comparison figures of every existing team in `team_ids`, as {team_id: details}, in one query.
+# Requested IDs missing from the result do not exist.
+@memoized_per_request
+def get_teams_comparison_details(team_ids):
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return {
+            team_id: to_team_comparison(team_id, snapshot.fantasy_team_totals(player_ids))
+            for team_id, player_ids in get_team_members(team_ids).items()
+        }
+
     with db_connection() as cursor:
         cursor.execute('''
             SELECT 
-                SUM(ps.points) as total_points, 
-                AVG(ps.two_percent) as avg_two_percent,
-                AVG(ps.three_percent) as avg_three_percent,
-                SUM(ps.assists) as total_assists,
-                SUM(ps.turnovers) as total_turnovers,
-                SUM(ps.points) / SUM(ps.games) as avg_ppg_ratio
-            FROM team_players tp
-            JOIN players p ON tp.player_id = p.id
-            JOIN player_seasons ps ON p.id = ps.player_id
-            WHERE tp.team_id = %s
-        ''', (team_id,))
-
-        result = cursor.fetchone()
-        if result:
-            atr = calculate_atr(result['total_assists'], result['total_turnovers'])
-            return {
-                "team_id": team_id,
-                "points": result['total_points'],
-                "twoPercent": result['avg_two_percent'],
-                "threePercent": result['avg_three_percent'],
-                "ATR": atr,
-                "PPG Ratio": result['avg_ppg_ratio']
-            }
-        return None
+                t.id as team_id,
+                f.total_points, 
+                f.two_percent_sum / NULLIF(f.two_percent_count, 0) as avg_two_percent,
+                f.three_percent_sum / NULLIF(f.three_percent_count, 0) as avg_three_percent,
+                f.total_assists,
+                f.total_turnovers,
+                f.total_assists / NULLIF(f.total_turnovers, 0) as atr,
+                f.total_points::float / NULLIF(f.total_games, 0) as ppg_ratio
+            FROM teams t
+            LEFT JOIN fantasy_team_totals f ON f.team_id = t.id
+            WHERE t.id = ANY(%s)
+        ''', (list(team_ids),))
 
+        return {result['team_id']: to_team_comparison(result['team_id'], result) for result in cursor.fetchall()}
 
 
+def sort_by_ppg_ratio(teams):
+    # Teams without games (no PPG ratio) go last
+    return sorted(teams, key=lambda x: (x['PPG Ratio'] is not None, x['PPG Ratio'] or 0), reverse=True)
 
-def compare_teams(team_ids):
-    teams = []
 
-    for team_id in team_ids:
-        team_details = get_team_comparison_details(team_id)
-        if team_details:
-            teams.append(team_details)
+# Returns (teams sorted by PPG ratio, IDs that do not exist)
+def compare_teams_with_missing(team_ids):
+    teams = get_teams_comparison_details(team_ids)
+    missing_team_ids = [team_id for team_id in team_ids if team_id not in teams]
+    return sort_by_ppg_ratio(teams.values()), missing_team_ids
 
-    sorted_teams = sorted(teams, key=lambda x: x['PPG Ratio'], reverse=True)
-
-    return sorted_teams
 
 # ------------------------------------------------------------
 # ------------------ compare regular teams ----------------------
 # ------------------------------------------------------------
+def to_team_stats(team_name, result):
+    return {
+        "team": team_name,
+        "points": result['total_points'],
+        "twoPercent": result['avg_two_percent'],
+        "threePercent": result['avg_three_percent'],
+        "ATR": result['atr'],
+        "PPG Ratio": result['ppg_ratio']
+    }
+
+
+# One row per season of the team in team_season_totals
+TEAM_STATS_QUERY = '''
+    SELECT 
+        SUM(total_points)::BIGINT as total_points, 
+        SUM(two_percent_sum) / NULLIF(SUM(two_percent_count), 0) as avg_two_percent,
+        SUM(three_percent_sum) / NULLIF(SUM(three_percent_count), 0) as avg_three_percent,
+        SUM(total_assists) as total_assists,
+        SUM(total_turnovers) as total_turnovers,
+        SUM(total_assists) / NULLIF(SUM(total_turnovers), 0) as atr,
+        SUM(total_points)::float / NULLIF(SUM(total_games), 0) as ppg_ratio
+    FROM team_season_totals
+    WHERE team = %s
+    HAVING COUNT(*) > 0
+'''
+
+
+@memoized_per_request
+@cached(TEAM_STATS)
 def get_team_stats_by_name(team_name):
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        result = snapshot.team_totals(team_name)
+        return to_team_stats(team_name, result) if result else None
+
     with db_connection() as cursor:
-        cursor.execute('''
-                    SELECT 
-                        SUM(ps.points) as total_points, 
-                        AVG(ps.two_percent) as avg_two_percent,
-                        AVG(ps.three_percent) as avg_three_percent,
-                        SUM(ps.assists) as total_assists,
-                        SUM(ps.turnovers) as total_turnovers,
-                        SUM(ps.points) / SUM(ps.games) as avg_ppg_ratio
-                    FROM player_seasons ps
-                    WHERE ps.team = %s
-                ''', (team_name,))
+        cursor.execute(TEAM_STATS_QUERY, (team_name,))
 
         result = cursor.fetchone()
         if result:
-            # חישוב ATR עבור הקבוצה
-            atr = calculate_atr(result['total_assists'], result['total_turnovers'])
-            return {
-                "team": team_name,
-                "points": result['total_points'],
-                "twoPercent": result['avg_two_percent'],
-                "threePercent": result['avg_three_percent'],
-                "ATR": atr,
-                "PPG Ratio": result['avg_ppg_ratio']
-            }
+            return to_team_stats(team_name, result)
         return None
 
 
-def compare_teams_by_name(team_names):
-    teams = []
-
-    for team_name in team_names:
-        team_details = get_team_stats_by_name(team_name)
-        if team_details:
-            teams.append(team_details)
-
-    sorted_teams = sorted(teams, key=lambda x: x['PPG Ratio'], reverse=True)
-
-    return sorted_teams
+# {team name: stats} of the names that have seasons. Shares its cache entries with
+# get_team_stats_by_name; with the async driver the names it misses are looked up concurrently.
+@memoized_per_request
+@cached_batch(TEAM_STATS)
+def get_teams_stats_by_name(team_names):
+    if async_queries_enabled() and get_snapshot() is None:
+        results = run_async(gather(*(fetchrow(TEAM_STATS_QUERY, team_name) for team_name in team_names)))
+        teams = {team_name: to_team_stats(team_name, result) if result else None
+                 for team_name, result in zip(team_names, results)}
+    else:
+        teams = {team_name: get_team_stats_by_name.uncached(team_name) for team_name in team_names}
+    return {team_name: stats for team_name, stats in teams.items() if stats}
+
+
+# Returns (teams sorted by PPG ratio, names without seasons)
+def compare_teams_by_name_with_missing(team_names):
+    teams = get_teams_stats_by_name(team_names)
+    missing_team_names = [team_name for team_name in team_names if team_name not in teams]
+    return sort_by_ppg_ratio(teams[team_name] for team_name in team_names if team_name in teams), \
+        missing_team_names
@@ -0,0 +1,9 @@
+import pytest
+
+from test.api_tests.stub_api import serve_stub_api
+
+
+@pytest.fixture(scope='module')
+def stub_api():
+    with serve_stub_api() as url:
+        yield url
@@ -0,0 +1,47 @@
+from api.get_player import ingest, parse_args, fetch_players_by_season
+from test.api_tests.stub_api import StubApiHandler
+
+
+def test_dry_run_counts_without_writing(stub_api):
+    """A dry run fetches every page and reports counts without touching the database"""
+    pages = []
+    summary = ingest([2022, 2023], concurrency=2, dry_run=True, base_url=stub_api,
+                     progress=lambda season, page_number, result: pages.append((season, page_number)))
+
+    assert summary['fetched'] == 35
+    assert summary['inserted'] == 0
+    assert summary['pages'] == len(pages)
+    assert [season['fetched'] for season in summary['seasons']] == [25, 10]
+
+
+def test_parse_args():
+    args = parse_args(['--seasons', '2023', '2024', '--concurrency', '8', '--batch-size', '200', '--dry-run'])
+    assert args.seasons == [2023, 2024]
+    assert args.concurrency == 8
+    assert args.batch_size == 200
+    assert args.dry_run
+    assert not args.incremental
+
+
+def test_failed_page_marks_season_incomplete(stub_api, monkeypatch):
+    """The summary names the pages that failed every retry instead of silently ending the season"""
+    monkeypatch.setattr('api.season_fetcher.backoff_delay', lambda attempt, base=0: 0)
+    monkeypatch.setattr(StubApiHandler, 'failing_pages', {(2023, 1)})
+
+    summary = ingest([2022, 2023], concurrency=2, dry_run=True, base_url=stub_api)
+
+    seasons = {season['season']: season for season in summary['seasons']}
+    assert seasons[2022]['complete'] and seasons[2022]['fetched'] == 25
+    assert not seasons[2023]['complete']
+    assert seasons[2023]['failed_pages'] == [1]
+    assert summary['failed_pages'] == 1
+
+
+def test_fetch_season_logs_a_failed_page_instead_of_raising(stub_api, monkeypatch, caplog):
+    """Like before the paged fetcher, a season that cannot be fetched gives no rows rather than an error"""
+    monkeypatch.setattr('api.season_fetcher.backoff_delay', lambda attempt, base=0: 0)
+    monkeypatch.setattr(StubApiHandler, 'failing_pages', {(2022, 1)})
+
+    assert fetch_players_by_season(2022, base_url=stub_api) == []
+    assert "Season 2022 is incomplete, pages 1 failed" in caplog.text
+    assert len(fetch_players_by_season(2023, base_url=stub_api)) == 10
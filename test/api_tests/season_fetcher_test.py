@@ -0,0 +1,58 @@
+import pytest
+import requests
+
+from api.season_fetcher import iter_season_pages, fetch_page, get_fetch_stats
+from test.api_tests.stub_api import StubApiHandler
+
+
+def test_walks_all_pages(stub_api):
+    """Every row of every season is returned, across page boundaries"""
+    rows_by_season = {}
+    for season, _, rows in iter_season_pages([2022, 2023, 2024], concurrency=3, page_size=10, base_url=stub_api):
+        rows_by_season.setdefault(season, []).extend(rows)
+
+    assert len(rows_by_season[2022]) == 25
+    assert len({row['playerName'] for row in rows_by_season[2022]}) == 25
+    assert len(rows_by_season[2023]) == 10
+    assert 2024 not in rows_by_season
+
+
+def test_retries_transient_errors(stub_api):
+    """A 503 is retried with backoff and the page still comes back"""
+    retries_before = get_fetch_stats()['retries']
+    StubApiHandler.fail_next = 2
+
+    rows = fetch_page(2023, 1, page_size=10, base_url=stub_api, backoff_base=0.01)
+
+    assert len(rows) == 10
+    assert get_fetch_stats()['retries'] - retries_before == 2
+
+
+@pytest.fixture
+def failing_page():
+    StubApiHandler.failing_pages = {(2022, 2)}
+    yield
+    StubApiHandler.failing_pages = set()
+
+
+def test_failed_middle_page_is_reported(stub_api, failing_page, caplog):
+    """A page failing every retry neither ends the season quietly nor loses the pages in flight"""
+    failed_pages = []
+    pages = [page_number for _, page_number, _ in iter_season_pages(
+        [2022], concurrency=3, page_size=5, base_url=stub_api, max_retries=1, backoff_base=0.01,
+        failed_pages=failed_pages)]
+
+    assert failed_pages == [(2022, 2)]
+    # Page 3 was in flight with page 2 and is still yielded
+    assert 1 in pages and 3 in pages and 2 not in pages
+    assert "Page 2 of season 2022 failed" in caplog.text
+
+
+def test_failed_page_raises_without_collector(stub_api, failing_page):
+    rows = []
+    with pytest.raises(requests.HTTPError):
+        for _, _, page_rows in iter_season_pages([2022, 2023], concurrency=2, page_size=5, base_url=stub_api,
+                                                 max_retries=0):
+            rows.extend(page_rows)
+    # The other season was still read in full
+    assert sum(1 for row in rows if row['season'] == 2023) == 10
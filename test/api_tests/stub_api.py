@@ -0,0 +1,57 @@
+import json
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# season -> number of rows the stub API holds for it
+SEASON_SIZES = {2022: 25, 2023: 10, 2024: 0}
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    fail_next = 0
+    # (season, page_number) answered with 503 on every attempt
+    failing_pages = set()
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        season = int(query['season'][0])
+        page_size = int(query['pageSize'][0])
+        page_number = int(query['pageNumber'][0])
+
+        if (season, page_number) in StubApiHandler.failing_pages:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        if StubApiHandler.fail_next > 0:
+            StubApiHandler.fail_next -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        start = (page_number - 1) * page_size
+        end = min(start + page_size, SEASON_SIZES.get(season, 0))
+        rows = [{"playerName": f"Player {season}-{i}", "season": season} for i in range(start, end)]
+
+        body = json.dumps(rows).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# Serves the stub on a free local port; yields the URL to pass as `base_url`
+@contextmanager
+def serve_stub_api():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubApiHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}/api/PlayerDataTotals/query'
+    finally:
+        server.shutdown()
@@ -0,0 +1,36 @@
+import os
+from collections import namedtuple
+
+# Query instrumentation is off by default; the tests run with it, like the benchmarks.
+# Set before the imports below read the configuration.
+os.environ.setdefault('QUERY_INSTRUMENTATION', 'true')
+
+import pytest
+
+from models.playerSeason import PlayerSeason
+from repository.aggregate_repository import refresh_all_aggregates
+from repository.database import create_tables, drop_all_tables
+from repository.player_repository import insert_players_bulk
+from repository.player_season_repository import insert_player_seasons_bulk
+from service.team_service import main_create_team
+
+SEEDED_POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C']
+
+SeededTeam = namedtuple('SeededTeam', ['team_id', 'player_ids'])
+
+
+@pytest.fixture(scope='module')
+def seeded_team():
+    """Fresh tables with one fantasy team of five players, one per position, each with a 2024
+    season: the even ones at BOS, the odd ones at LAL. Dropped again after the module."""
+    create_tables()
+    player_ids = list(insert_players_bulk([f'Seeded {i}' for i in range(len(SEEDED_POSITIONS))]).values())
+    insert_player_seasons_bulk([
+        PlayerSeason(player_id=player_id, position=position, season=2024, team='LAL' if i % 2 else 'BOS',
+                     points=100 * (i + 1), games=10, twoPercent=0.5, threePercent=0.25, ATR=1.0, PPG_ratio=1.0,
+                     assists=20.0, turnovers=8.0)
+        for i, (player_id, position) in enumerate(zip(player_ids, SEEDED_POSITIONS))
+    ])
+    refresh_all_aggregates()
+    yield SeededTeam(main_create_team('Seeded Team', player_ids), player_ids)
+    drop_all_tables()
@@ -0,0 +1,41 @@
+import pytest
+
+from main import create_app, warm_up, WARM_UP_POSITIONS
+from repository.database import create_tables, drop_all_tables
+from service.cache import configure_cache, get_cache_stats, PLAYER_STATS
+
+
+@pytest.fixture(scope='module')
+def app():
+    create_tables()
+    yield create_app()
+    drop_all_tables()
+
+
+def test_create_app_without_reloader(app, monkeypatch):
+    """The factory returns the app whether or not it runs under the debug reloader"""
+    monkeypatch.delenv('WERKZEUG_RUN_MAIN', raising=False)
+    assert create_app() is not None
+    assert app.test_client().get('/api/players?position=XX').status_code == 400
+
+
+def test_query_instrumentation_is_on_in_tests(app):
+    """Off by default in production; test/conftest.py turns it on"""
+    assert 'X-DB-Queries' in app.test_client().get('/api/teams/999999').headers
+
+
+def test_warm_up_fills_the_player_cache(app):
+    configure_cache()
+    timings = warm_up(app)
+    assert set(timings) == {'pool'} | {f'players_{position}' for position in WARM_UP_POSITIONS}
+
+    app.test_client().get('/api/players?position=PG')
+    assert get_cache_stats()['namespaces'][PLAYER_STATS]['hits'] == 1
+
+
+def test_duplicate_players_are_rejected(app):
+    client = app.test_client()
+    for response in (client.post('/api/teams', json={"name_team": "Twice", "players": [1, 1, 2, 3, 4]}),
+                     client.put('/api/teams/1', json={"players": [1, 2, 3, 4, 4]})):
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Team must have 5 different players"}
@@ -0,0 +1,121 @@
+import pytest
+from flask import Flask
+
+from repository.data_version_repository import bump_data_version
+from repository.database import db_connection
+from controller.compression import init_compression
+from controller.players_controller import players_blueprint
+from controller.team_controller import teams_blueprint
+from service.cache import configure_cache, get_cache_stats, TEAM_DETAILS
+from service.data_version import reset_data_version
+from service.team_service import update_team_players, delete_team_by_id
+
+
+@pytest.fixture(scope='module')
+def players(seeded_team):
+    configure_cache()
+    reset_data_version()
+    return seeded_team.player_ids
+
+
+@pytest.fixture(scope='module')
+def team_id(players, seeded_team):
+    return seeded_team.team_id
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(teams_blueprint, url_prefix='/api')
+    app.register_blueprint(players_blueprint, url_prefix='/api')
+    return app.test_client()
+
+
+def test_etag_and_not_modified(client, team_id):
+    """A matching If-None-Match is answered with an empty 304"""
+    response = client.get(f'/api/teams/{team_id}')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-cache'
+    etag = response.headers['ETag']
+
+    response = client.get(f'/api/teams/{team_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.data == b''
+
+
+def test_weak_comparison(client, team_id):
+    """If-None-Match compares weakly, so the weak form of the tag matches too"""
+    etag = client.get(f'/api/teams/{team_id}').headers['ETag']
+    response = client.get(f'/api/teams/{team_id}', headers={'If-None-Match': f'W/{etag}'})
+    assert response.status_code == 304
+
+
+def test_errors_have_no_etag(client, team_id):
+    response = client.get('/api/teams/999999')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+
+
+def test_current_tag_of_another_request_is_not_a_match(client, team_id):
+    """Requests the view rejects are answered as such, whatever tag the client sends"""
+    etag = client.get('/api/players?position=PG').headers['ETag']
+    assert client.get('/api/players?position=PG', headers={'If-None-Match': etag}).status_code == 304
+
+    assert client.get('/api/players?position=XX', headers={'If-None-Match': etag}).status_code == 400
+    assert client.get('/api/teams/999999', headers={'If-None-Match': etag}).status_code == 404
+
+
+def test_team_update_changes_etag(client, team_id, players):
+    """A write in this process is seen by the next request"""
+    etag = client.get(f'/api/teams/{team_id}').headers['ETag']
+    update_team_players(team_id, players, 'Renamed Conditional')
+
+    response = client.get(f'/api/teams/{team_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['team_name'] == 'Renamed Conditional'
+
+
+def test_write_elsewhere_drops_cached_data(client, team_id, monkeypatch):
+    """A version moved on by another process invalidates what this one cached"""
+    monkeypatch.setattr('service.data_version.DATA_VERSION_TTL', 0)
+    etag = client.get(f'/api/teams/{team_id}').headers['ETag']
+    misses = get_cache_stats()['namespaces'][TEAM_DETAILS]['misses']
+    bump_data_version()
+
+    response = client.get(f'/api/teams/{team_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert get_cache_stats()['namespaces'][TEAM_DETAILS]['misses'] == misses + 1
+
+
+
+def test_write_elsewhere_before_local_write_drops_cached_data(client, team_id, monkeypatch):
+    """A foreign write landing just before one of this process's own is not taken for part of it"""
+    monkeypatch.setattr('service.data_version.DATA_VERSION_TTL', float('inf'))
+    client.get(f'/api/teams/{team_id}')
+
+    with db_connection() as cursor:
+        cursor.execute('UPDATE teams SET team_name = %s WHERE id = %s', ('Renamed Elsewhere', team_id))
+    bump_data_version()
+    delete_team_by_id(999999)
+
+    assert client.get(f'/api/teams/{team_id}').get_json()['team_name'] == 'Renamed Elsewhere'
+
+
+def test_not_modified_for_compressed_variant(team_id):
+    """The ETag of a gzip body revalidates too, and the 304 echoes it and varies like the 200"""
+    app = Flask(__name__)
+    app.register_blueprint(teams_blueprint, url_prefix='/api')
+    init_compression(app, min_size=0)
+    client = app.test_client()
+
+    response = client.get(f'/api/teams/{team_id}', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    etag = response.headers['ETag']
+    assert etag.endswith('-gzip"')
+
+    response = client.get(f'/api/teams/{team_id}', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert 'Accept-Encoding' in response.headers['Vary']
@@ -0,0 +1,58 @@
+import pytest
+from flask import Flask
+
+from controller.debug_controller import debug_blueprint, init_query_instrumentation
+from controller.team_controller import teams_blueprint
+from repository.database import create_tables, drop_all_tables
+from repository.query_instrumentation import reset_fingerprint_stats
+from service.data_version import reset_data_version
+
+
+@pytest.fixture(scope='module')
+def app():
+    create_tables()
+    # The data version is read once up front, so the counts below are the views' own queries
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr('service.data_version.DATA_VERSION_TTL', float('inf'))
+    reset_data_version()
+    app = Flask(__name__)
+    app.register_blueprint(teams_blueprint, url_prefix='/api')
+    app.register_blueprint(debug_blueprint, url_prefix='/api')
+    init_query_instrumentation(app, warn_threshold=0)
+    reset_fingerprint_stats()
+    yield app
+    monkeypatch.undo()
+    drop_all_tables()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_query_headers(client):
+    """Every response reports the statements and connections it used"""
+    response = client.get('/api/teams/compare?team=1&team=2')
+    assert response.status_code == 404
+    assert response.headers['X-DB-Queries'] == '1'
+    assert response.headers['X-DB-Connections'] == '1'
+    assert float(response.headers['X-DB-Time-Ms']) >= 0
+    assert response.headers['X-DB-Queries-Saved'] == '0'
+
+
+def test_threshold_warning(client, caplog):
+    """Requests above the threshold are logged"""
+    client.get('/api/teams/compare?team=1&team=2')
+    assert "ran 1 queries (threshold 0)" in caplog.text
+
+
+def test_debug_endpoint_aggregates_fingerprints(client):
+    """The debug endpoint lists the slowest statements across requests"""
+    client.delete('/api/debug/queries')
+    client.get('/api/teams/compare?team=1&team=2')
+    client.get('/api/teams/compare?team=3&team=4')
+
+    queries = client.get('/api/debug/queries?order=count').get_json()['queries']
+    # Both requests ran the same statement, with different team IDs
+    assert queries[0]['count'] == 2
+    assert client.get('/api/debug/queries?order=bogus').status_code == 400
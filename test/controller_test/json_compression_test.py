@@ -0,0 +1,63 @@
+import gzip
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify
+
+from controller.compression import init_compression
+from controller.json_provider import FastJSONProvider
+
+ROWS = [{"playerName": f"Player {i}", "points": i, "ATR": Decimal("1.25")} for i in range(100)]
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    init_compression(app, min_size=1024)
+
+    @app.route('/rows')
+    def rows():
+        response = jsonify(ROWS)
+        response.set_etag('v1')
+        return response
+
+    @app.route('/small')
+    def small():
+        return jsonify({"b": 1, "a": Decimal("2.5")})
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_decimal_as_number_and_sorted_keys(client):
+    assert client.get('/small').data == b'{"a":2.5,"b":1}\n'
+
+
+def test_fallback_encoder(app):
+    """Values orjson refuses go through the default encoder"""
+    with app.app_context():
+        assert app.json.dumps({"big": 2 ** 70}) == '{"big":1180591620717411303424}'
+        assert app.json.dumps({"a": 1}, indent=2) == '{\n  "a": 1\n}'
+
+
+def test_gzip_above_threshold(client):
+    response = client.get('/rows', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    # Encoded bytes get their own strong ETag
+    assert response.headers['ETag'] == '"v1-gzip"'
+    assert gzip.decompress(response.data).startswith(b'[{"ATR":1.25,"playerName":"Player 0"')
+
+
+def test_uncompressed_below_threshold_or_not_accepted(client):
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+
+    response = client.get('/rows')
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['ETag'] == '"v1"'
+    assert response.get_json()[1]['points'] == 1
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from flask import Flask
+
+from controller.metrics_controller import metrics_blueprint, init_request_metrics
+from controller.team_controller import teams_blueprint
+from repository.database import create_tables, drop_all_tables
+
+pytest.importorskip('prometheus_client')
+
+
+@pytest.fixture(scope='module')
+def client():
+    create_tables()
+    app = Flask(__name__)
+    app.register_blueprint(teams_blueprint, url_prefix='/api')
+    app.register_blueprint(metrics_blueprint)
+    init_request_metrics(app)
+    yield app.test_client()
+    drop_all_tables()
+
+
+def test_metrics_endpoint(client):
+    """Requests are counted per route template, with pool gauges alongside"""
+    client.get('/api/teams/1')
+    client.get('/api/teams/2')
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'nba_http_request_duration_seconds_count{method="GET",route="/api/teams/<int:team_id>",status="404"}' \
+           in body
+    assert 'nba_http_requests_in_flight' in body
+    assert 'nba_db_pool_connections{state="size"}' in body
+
+
+def test_multiprocess_metrics_are_aggregated(tmp_path):
+    """Counters written by separate worker processes add up in one scrape"""
+    env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(tmp_path)}
+    worker = "from service.monitoring import record_fetch; record_fetch(pages_fetched=2)"
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', worker], env=env, check=True)
+
+    scrape = "from service.monitoring import render_metrics; print(render_metrics()[0].decode())"
+    body = subprocess.run([sys.executable, '-c', scrape], env=env, check=True, capture_output=True,
+                          text=True).stdout
+    assert 'nba_fetch_events_total{event="pages_fetched"} 4.0' in body
@@ -51,3 +51,30 @@ def test_get_players_missing_position(client):
     response = client.get('/players')
     assert response.status_code == 400
     assert response.get_json() == {"error": "Position is required"}
+
+
+# Test case: season that is not a number
+def test_get_players_invalid_season(client):
+    response = client.get('/players', query_string={'position': 'PG', 'season': 'last'})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Season must be a number"}
+
+
+# Test case: page size out of range
+def test_get_players_invalid_limit(client):
+    response = client.get('/players', query_string={'position': 'PG', 'limit': 0})
+    assert response.status_code == 400
+
+
+# Test case: page size that is not a number
+def test_get_players_non_numeric_limit(client):
+    response = client.get('/players', query_string={'position': 'PG', 'limit': 'abc'})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Limit must be a number"}
+
+
+# Test case: malformed pagination cursor
+def test_get_players_invalid_cursor(client):
+    response = client.get('/players', query_string={'position': 'PG', 'limit': 10, 'after': 'abc'})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid 'after' cursor"}
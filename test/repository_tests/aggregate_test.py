@@ -0,0 +1,99 @@
+import pytest
+
+from api.get_player import process_season_bulk
+from models.playerSeason import PlayerSeason
+from models.teamPlayer import TeamPlayer
+from repository.aggregate_repository import refresh_aggregates_for_players
+from repository.database import create_tables, drop_all_tables, db_connection
+from repository.player_repository import insert_players_bulk
+from repository.player_season_repository import insert_player_seasons_bulk, upsert_player_seasons_bulk, \
+    get_latest_positions
+from repository.team_repository import create_new_team
+
+
+@pytest.fixture(scope='module')
+def setup_database():
+    create_tables()
+    yield
+    drop_all_tables()
+
+
+def season(player_id, year, team, points, two_percent, position="PG"):
+    return PlayerSeason(player_id=player_id, position=position, season=year, team=team, points=points, games=10,
+                        twoPercent=two_percent, threePercent=0.3, ATR=1.0, PPG_ratio=1.0, assists=20,
+                        turnovers=10)
+
+
+def career_totals(player_id):
+    with db_connection() as cursor:
+        cursor.execute('SELECT * FROM player_career_totals WHERE player_id = %s', (player_id,))
+        return cursor.fetchone()
+
+
+def test_aggregates_follow_ingestion(setup_database):
+    """Career, team-season and fantasy totals are refreshed for the players that changed"""
+    player_ids = insert_players_bulk(['Agg One', 'Agg Two'])
+    one, two = player_ids['Agg One'], player_ids['Agg Two']
+    team_id, _ = create_new_team('Aggregates', [TeamPlayer(one, 'Agg One', 'PG'), TeamPlayer(two, 'Agg Two', 'SG')])
+
+    insert_player_seasons_bulk([season(one, 2022, 'OKC', 100, 0.5), season(one, 2023, 'OKC', 200, None),
+                                season(two, 2023, 'HOU', 300, 0.4)])
+    refresh_aggregates_for_players([one, two], [('OKC', 2022), ('OKC', 2023), ('HOU', 2023)])
+
+    totals = career_totals(one)
+    assert totals['total_points'] == 300
+    assert totals['two_percent_sum'] == 0.5
+    assert totals['two_percent_count'] == 1
+
+    upsert_player_seasons_bulk([season(one, 2023, 'OKC', 250, None)])
+    refresh_aggregates_for_players([one], [('OKC', 2023)])
+    assert career_totals(one)['total_points'] == 350
+
+    with db_connection() as cursor:
+        cursor.execute('SELECT total_points FROM fantasy_team_totals WHERE team_id = %s', (team_id,))
+        assert cursor.fetchone()['total_points'] == 650
+
+        cursor.execute("SELECT total_points FROM team_season_totals WHERE team = 'OKC' AND season = 2023")
+        assert cursor.fetchone()['total_points'] == 250
+
+
+def test_latest_season_projection(setup_database):
+    """player_latest_season follows the most recent season of every refreshed player"""
+    player_ids = insert_players_bulk(['Latest One', 'Latest Two'])
+    one, two = player_ids['Latest One'], player_ids['Latest Two']
+
+    insert_player_seasons_bulk([season(one, 2022, 'OKC', 100, 0.5, 'SG'), season(one, 2023, 'OKC', 200, 0.5, 'SF'),
+                                season(two, 2022, 'HOU', 300, 0.4, 'C')])
+    refresh_aggregates_for_players([one, two], [('OKC', 2022), ('OKC', 2023), ('HOU', 2022)])
+    assert get_latest_positions([one, two]) == {one: 'SF', two: 'C'}
+
+    insert_player_seasons_bulk([season(two, 2024, 'HOU', 300, 0.4, 'PF')])
+    refresh_aggregates_for_players([two], [('HOU', 2024)])
+    assert get_latest_positions([one, two, 999999]) == {one: 'SF', two: 'PF'}
+
+
+def team_season_points(team, year):
+    with db_connection() as cursor:
+        cursor.execute('SELECT total_points FROM team_season_totals WHERE team = %s AND season = %s', (team, year))
+        row = cursor.fetchone()
+        return row['total_points'] if row else None
+
+
+def test_ingested_page_refreshes_only_its_groups(setup_database):
+    """A page refreshes the old and new team of its rows, and leaves the season's other teams alone"""
+    def api_row(name, team, points):
+        return {'playerName': name, 'position': 'PG', 'season': 2030, 'team': team, 'points': points, 'games': 10,
+                'twoPercent': 0.5, 'threePercent': 0.3, 'assists': 20.0, 'turnovers': 10.0}
+
+    process_season_bulk(2030, [api_row('Group One', 'DEN', 100), api_row('Group Two', 'MIA', 200)])
+    assert (team_season_points('DEN', 2030), team_season_points('MIA', 2030)) == (100, 200)
+
+    with db_connection() as cursor:
+        # Marker: a group the next page does not touch must not be recomputed
+        cursor.execute("UPDATE team_season_totals SET total_points = -1 WHERE team = 'MIA' AND season = 2030")
+
+    # Group One moves from DEN to PHX
+    process_season_bulk(2030, [api_row('Group One', 'PHX', 150)], incremental=True)
+    assert team_season_points('DEN', 2030) is None
+    assert team_season_points('PHX', 2030) == 150
+    assert team_season_points('MIA', 2030) == -1
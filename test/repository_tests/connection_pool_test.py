@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from repository.connection_pool import ConnectionPool, PoolExhaustedError
+from repository.database import get_db_connection
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool(get_db_connection, min_size=1, max_size=2, timeout=0.1)
+    yield pool
+    pool.closeall()
+
+
+def test_connection_is_reused(pool):
+    """A returned connection is handed out again instead of opening a new one"""
+    first = pool.getconn()
+    pool.putconn(first)
+    second = pool.getconn()
+    pool.putconn(second)
+
+    assert first is second
+    stats = pool.stats()
+    assert stats['checkouts'] == 2
+    assert stats['connections_created'] == 1
+
+
+def test_pool_exhausted(pool):
+    """Checking out more than max_size connections times out and is counted"""
+    held = [pool.getconn(), pool.getconn()]
+
+    with pytest.raises(PoolExhaustedError):
+        pool.getconn()
+
+    stats = pool.stats()
+    assert stats['exhausted'] == 1
+    assert stats['timeouts'] == 1
+    assert stats['in_use'] == 2
+
+    for connection in held:
+        pool.putconn(connection)
+
+
+def test_closed_connection_is_replaced(pool):
+    """A connection that died while idle is discarded on checkout"""
+    connection = pool.getconn()
+    pool.putconn(connection)
+    connection.close()
+
+    replacement = pool.getconn()
+    pool.putconn(replacement)
+
+    assert replacement is not connection
+    assert pool.stats()['connections_discarded'] == 1
+
+
+def test_slow_connect_does_not_block_checkouts():
+    """An idle connection is handed out while another thread is still connecting"""
+    connecting = threading.Event()
+    release = threading.Event()
+    connections = []
+
+    def connect():
+        if connections:
+            connecting.set()
+            release.wait(5)
+        connections.append(get_db_connection())
+        return connections[-1]
+
+    pool = ConnectionPool(connect, min_size=0, max_size=2, timeout=5)
+    held = pool.getconn()
+    opener = threading.Thread(target=lambda: pool.putconn(pool.getconn()))
+    opener.start()
+    assert connecting.wait(5)
+
+    pool.putconn(held)
+    started = time.monotonic()
+    again = pool.getconn()
+    elapsed = time.monotonic() - started
+
+    release.set()
+    opener.join(5)
+    pool.putconn(again)
+    pool.closeall()
+
+    assert again is held
+    assert elapsed < 1
+    assert pool.stats()['connections_created'] == 2
@@ -0,0 +1,49 @@
+import pytest
+
+from models.teamPlayer import TeamPlayer
+from repository.data_version_repository import get_data_version, bump_data_version
+from repository.database import create_tables, drop_all_tables, unit_of_work
+from repository.player_repository import insert_new_player
+from repository.team_repository import create_new_team, update_team, delete_team
+
+
+@pytest.fixture(scope='module')
+def setup_database():
+    create_tables()
+    yield
+    drop_all_tables()
+
+
+def test_bump_data_version(setup_database):
+    """Every bump moves the version on by one"""
+    version = get_data_version()
+    assert bump_data_version() == version + 1
+    assert get_data_version() == version + 1
+
+
+def test_bump_rolls_back_with_the_write(setup_database):
+    """The bump belongs to the caller's transaction"""
+    version = get_data_version()
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            bump_data_version()
+            raise RuntimeError("write failed")
+    assert get_data_version() == version
+
+
+def test_team_writes_bump_data_version(setup_database):
+    """Creating, updating and deleting a team each move the version on and return the new one"""
+    player_ids = [insert_new_player(f'Version Player {i}') for i in range(5)]
+    positions = ['PG', 'SG', 'SF', 'PF', 'C']
+
+    version = get_data_version()
+    team_id, created_version = create_new_team('Version Team', [
+        TeamPlayer(player_id, f'Version Player {i}', position) for i, (player_id, position) in enumerate(zip(player_ids, positions))
+    ])
+    assert get_data_version() == created_version == version + 1
+
+    assert update_team(dict(zip(player_ids, positions)), team_id, 'Renamed Version Team') == version + 2
+    assert get_data_version() == version + 2
+
+    assert delete_team(team_id) == version + 3
+    assert get_data_version() == version + 3
@@ -0,0 +1,33 @@
+import pytest
+
+from repository.database import db_connection, drop_all_tables
+from repository.migrations import MIGRATIONS, migrate, rollback, current_version
+
+
+@pytest.fixture
+def empty_database():
+    drop_all_tables()
+    yield
+    drop_all_tables()
+
+
+def index_names():
+    with db_connection() as cursor:
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE schemaname = 'public'")
+        return {row['indexname'] for row in cursor.fetchall()}
+
+
+def test_migrate_applies_all_versions_once(empty_database):
+    """Migrating twice applies every migration exactly once"""
+    assert migrate() == [migration.version for migration in MIGRATIONS]
+    assert migrate() == []
+    assert current_version() == MIGRATIONS[-1].version
+    assert 'idx_team_players_player_id' in index_names()
+
+
+def test_rollback_to_target(empty_database):
+    """Rolling back reverts newer migrations only"""
+    migrate()
+    assert rollback(2) == [migration.version for migration in reversed(MIGRATIONS) if migration.version > 2]
+    assert current_version() == 2
+    assert 'idx_team_players_player_id' not in index_names()
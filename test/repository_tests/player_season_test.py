@@ -1,8 +1,9 @@
 import pytest
 from models.playerSeason import PlayerSeason
 from repository.database import create_tables, get_db_connection, drop_all_tables
-from repository.player_repository import insert_new_player
-from repository.player_season_repository import insert_player_season, get_player_by_position
+from repository.player_repository import insert_new_player, insert_players_bulk
+from repository.player_season_repository import insert_player_season, get_player_by_position, \
+    insert_player_seasons_bulk, upsert_player_seasons_bulk, iter_player_by_position
 
 
 @pytest.fixture(scope='module')
@@ -90,3 +91,78 @@ def test_get_player_by_position(setup_database):
 def test_get_nonexistent_position(setup_database):
     players = get_player_by_position("C")
     assert len(players) == 0
+
+
+def test_insert_player_seasons_bulk(setup_database):
+    player_ids = insert_players_bulk(['Bulk One', 'Bulk Two'])
+
+    player_seasons = [
+        PlayerSeason(player_id=player_ids[name], position="PF", season=2023, team="MIA", points=500, games=60,
+                     twoPercent=0.5, threePercent=0.3, ATR=1.0, PPG_ratio=8.0, assists=100, turnovers=50)
+        for name in ['Bulk One', 'Bulk Two']
+    ]
+
+    assert insert_player_seasons_bulk(player_seasons) == 2
+    # Re-running the same batch inserts nothing
+    assert insert_player_seasons_bulk(player_seasons) == 0
+
+
+def test_upsert_player_seasons_bulk(setup_database):
+    player_ids = insert_players_bulk(['Upsert One'])
+    player_season = PlayerSeason(player_id=player_ids['Upsert One'], position="C", season=2022, team="DEN",
+                                 points=900, games=70, twoPercent=0.6, threePercent=0.3, ATR=2.5, PPG_ratio=12.0,
+                                 assists=300, turnovers=120)
+
+    assert upsert_player_seasons_bulk([player_season]) == (1, 0)
+    # Unchanged rows are not rewritten
+    assert upsert_player_seasons_bulk([player_season]) == (0, 0)
+
+    player_season = player_season._replace(points=950)
+    assert upsert_player_seasons_bulk([player_season]) == (0, 1)
+
+
+def test_get_player_by_position_filters(setup_database):
+    player_ids = insert_players_bulk(['Filter One'])
+    insert_player_seasons_bulk([
+        PlayerSeason(player_id=player_ids['Filter One'], position="SF", season=season, team=team, points=700,
+                     games=65, twoPercent=0.5, threePercent=0.35, ATR=1.2, PPG_ratio=10.0, assists=120,
+                     turnovers=100)
+        for season, team in [(2022, 'PHX'), (2023, 'PHX'), (2024, 'DAL')]
+    ])
+
+    assert len(get_player_by_position("SF")) == 3
+    assert [player['season'] for player in get_player_by_position("SF", seasons=[2024])] == [2024]
+    assert len(get_player_by_position("SF", seasons=[2022, 2023])) == 2
+    assert len(get_player_by_position("SF", team='PHX')) == 2
+    assert get_player_by_position("SF", seasons=[2024], team='PHX') == []
+
+
+def test_get_player_by_position_keyset_pages(setup_database):
+    player_ids = insert_players_bulk([f'Page Player {i}' for i in range(5)])
+    insert_player_seasons_bulk([
+        PlayerSeason(player_id=player_id, position="PF", season=2021, team="UTA", points=100, games=10,
+                     twoPercent=0.5, threePercent=0.3, ATR=1.0, PPG_ratio=10.0, assists=10, turnovers=10)
+        for player_id in player_ids.values()
+    ])
+
+    all_rows = get_player_by_position("PF", seasons=[2021])
+    first_page = get_player_by_position("PF", seasons=[2021], limit=3)
+    last = first_page[-1]
+    second_page = get_player_by_position("PF", seasons=[2021], limit=3, after=(last['season'], last['id']))
+
+    assert first_page + second_page == all_rows
+    assert len(second_page) == 2
+    assert list(iter_player_by_position("PF", seasons=[2021], itersize=2)) == all_rows
+
+
+def test_player_season_factories():
+    api_row = {'playerName': 'Factory', 'position': 'PF', 'season': 2024, 'team': 'MIA', 'points': 10,
+               'games': 2, 'twoPercent': 0.5, 'threePercent': 0.25, 'ATR': 1.0, 'PPG_ratio': 5.0,
+               'assists': 4.0, 'turnovers': 4.0}
+    player_season = PlayerSeason.from_api(api_row, 7)
+
+    assert player_season == PlayerSeason.from_row((7, 'PF', 2024, 'MIA', 10, 2, 0.5, 0.25, 1.0, 5.0, 4.0, 4.0))
+    assert player_season.team == 'MIA'
+    # Missing keys take the defaults
+    assert PlayerSeason.from_api({'position': 'C', 'season': 2024}, 8).points == 0
+    assert not hasattr(player_season, '__dict__')
@@ -1,7 +1,8 @@
 import pytest
 
 from repository.database import create_tables, get_db_connection, drop_all_tables
-from repository.player_repository import insert_new_player, get_player_id_by_name, get_player_name_by_id
+from repository.player_repository import insert_new_player, get_player_id_by_name, get_player_name_by_id, \
+    insert_players_bulk
 
 
 @pytest.fixture(scope='module')
@@ -49,3 +50,10 @@ def test_get_nonexistent_player_by_name(setup_database):
 def test_get_nonexistent_player_by_id(setup_database):
     fetched_name = get_player_name_by_id(999999)
     assert fetched_name is None
+
+
+def test_insert_players_bulk(setup_database):
+    existing_id = insert_new_player('Larry Bird')
+    player_ids = insert_players_bulk(['Larry Bird', 'Tim Duncan', 'Tim Duncan'])
+    assert player_ids['Larry Bird'] == existing_id
+    assert player_ids['Tim Duncan'] == get_player_id_by_name('Tim Duncan')
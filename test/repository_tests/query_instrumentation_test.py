@@ -0,0 +1,42 @@
+import pytest
+
+from repository.database import create_tables, drop_all_tables, unit_of_work
+from repository.player_repository import insert_new_player, get_player_id_by_name, insert_players_bulk
+from repository.query_instrumentation import collect_queries, fingerprint
+
+
+@pytest.fixture(scope='module')
+def setup_database():
+    create_tables()
+    yield
+    drop_all_tables()
+
+
+def test_fingerprint_groups_statements():
+    assert fingerprint("SELECT * FROM players  WHERE id = 42 AND player_name = 'O''Neal'") == \
+        "SELECT * FROM players WHERE id = ? AND player_name = ?"
+    assert fingerprint("SELECT id FROM players WHERE id = %(id)s OR id = %s") == \
+        "SELECT id FROM players WHERE id = ? OR id = ?"
+    # Rows expanded by execute_values collapse into one group
+    assert fingerprint(b"INSERT INTO players (player_name) VALUES ('a'),('b'),('c')") == \
+        "INSERT INTO players (player_name) VALUES (...)"
+
+
+def test_collector_counts_queries_and_connections(setup_database):
+    insert_players_bulk(['Counted One', 'Counted Two'])
+
+    with collect_queries() as collector:
+        with unit_of_work():
+            for name in ['Counted One', 'Counted Two', 'Counted Three']:
+                get_player_id_by_name(name)
+
+    assert collector.count == 3
+    assert collector.connections == 1
+    assert collector.repeated() == [("SELECT id FROM players WHERE player_name = ?", 3)]
+
+
+def test_queries_outside_a_collector_are_not_recorded(setup_database):
+    with collect_queries() as collector:
+        pass
+    insert_new_player('Unrecorded')
+    assert collector.count == 0
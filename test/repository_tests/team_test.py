@@ -27,7 +27,7 @@ def test_create_new_team(setup_database):
         TeamPlayer(player_id=player2_id, player_name='Player Two', player_position='C')
     ]
 
-    team_id = create_new_team('Team A', players_with_positions)
+    team_id, _ = create_new_team('Team A', players_with_positions)
     assert team_id is not None
 
     team = get_team_by_id(team_id)
@@ -64,7 +64,7 @@ def test_update_team(setup_database):
         TeamPlayer(player_id=player2_id, player_name='Player Two', player_position='C')
     ]
 
-    team_id = create_new_team('Team C', players_with_positions)
+    team_id, _ = create_new_team('Team C', players_with_positions)
 
     updated_players = {
         player1_id: 'SF',
@@ -86,7 +86,7 @@ def test_delete_team(setup_database):
         TeamPlayer(player_id=player2_id, player_name='Player Two', player_position='C')
     ]
 
-    team_id = create_new_team('Team D', players_with_positions)
+    team_id, _ = create_new_team('Team D', players_with_positions)
 
     delete_team(team_id)
 
@@ -0,0 +1,37 @@
+import pytest
+
+from repository.database import create_tables, drop_all_tables, db_connection, unit_of_work, get_pool, \
+    in_transaction
+from repository.player_repository import insert_new_player, get_player_id_by_name
+
+
+@pytest.fixture(scope='module')
+def setup_database():
+    create_tables()
+    yield
+    drop_all_tables()
+
+
+def test_nested_calls_share_connection(setup_database):
+    """Repository calls inside a unit of work reuse the outer connection"""
+    checkouts_before = get_pool().stats()['checkouts']
+
+    with unit_of_work() as outer_cursor:
+        assert in_transaction()
+        with db_connection() as inner_cursor:
+            assert inner_cursor.connection is outer_cursor.connection
+        insert_new_player('Shared Connection Player')
+
+    assert not in_transaction()
+    assert get_pool().stats()['checkouts'] - checkouts_before == 1
+    assert get_player_id_by_name('Shared Connection Player') is not None
+
+
+def test_unit_of_work_rolls_back(setup_database):
+    """An error anywhere in the unit of work rolls back every nested write"""
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            insert_new_player('Rolled Back Player')
+            raise RuntimeError("abort")
+
+    assert get_player_id_by_name('Rolled Back Player') is None
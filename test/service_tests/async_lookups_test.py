@@ -0,0 +1,56 @@
+import pytest
+
+from repository.async_database import configure_async_queries, close_async_pool, to_asyncpg, ASYNC_AVAILABLE
+from repository.query_instrumentation import collect_queries
+from service.cache import configure_cache
+from service.team_service import get_team_details, get_teams_stats_by_name, compare_teams_by_name_with_missing
+
+pytestmark = pytest.mark.skipif(not ASYNC_AVAILABLE, reason="requires asyncpg")
+
+
+@pytest.fixture(scope='module')
+def team_id(seeded_team):
+    configure_cache(max_size=0)
+    yield seeded_team.team_id
+    close_async_pool()
+    configure_async_queries()
+    configure_cache()
+
+
+def both_drivers(read):
+    configure_async_queries(False)
+    from_psycopg2 = read()
+    configure_async_queries(True)
+    try:
+        return from_psycopg2, read()
+    finally:
+        configure_async_queries(False)
+
+
+def test_placeholders():
+    assert to_asyncpg("SELECT %s WHERE a %% 2 = %s") == "SELECT $1 WHERE a % 2 = $2"
+
+
+def test_reads_match_sync_driver(team_id):
+    for read in (lambda: get_team_details(team_id),
+                 lambda: get_team_details(999999),
+                 lambda: get_teams_stats_by_name(['LAL', 'Unknown', 'BOS']),
+                 lambda: compare_teams_by_name_with_missing(['LAL', 'BOS', 'Unknown'])):
+        from_psycopg2, from_asyncpg = both_drivers(read)
+        assert from_asyncpg == from_psycopg2
+
+    sorted_teams, missing = compare_teams_by_name_with_missing(['LAL', 'BOS', 'Unknown'])
+    assert [team['team'] for team in sorted_teams] == ['LAL', 'BOS']
+    assert missing == ['Unknown']
+
+
+def test_async_queries_are_collected(team_id):
+    """Concurrent lookups are reported to the request's collector, each on its own connection"""
+    configure_async_queries(True)
+    try:
+        with collect_queries() as collector:
+            get_teams_stats_by_name(['LAL', 'BOS', 'NYK'])
+    finally:
+        configure_async_queries(False)
+    assert collector.count == 3
+    assert collector.connections == 3
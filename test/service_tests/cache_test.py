@@ -0,0 +1,116 @@
+import fnmatch
+import time
+
+import pytest
+
+from service.cache import LRUCache, SharedCacheBackend, configure_cache, cached, cached_batch, invalidate, \
+    get_cache_stats
+
+
+# Local stand-in for a Redis client, implementing the calls SharedCacheBackend makes
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in self.data if fnmatch.fnmatch(key, match)]
+
+
+@pytest.fixture
+def square():
+    configure_cache()
+    calls = []
+
+    @cached('squares')
+    def square(number):
+        calls.append(number)
+        return number * number
+
+    square.calls = calls
+    yield square
+    configure_cache()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') == (True, 1)
+    assert cache.get('b') == (False, None)
+
+
+def test_lru_entries_expire():
+    cache = LRUCache(max_size=2, ttl=0.01)
+    cache.set('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a') == (False, None)
+
+
+def test_cached_counts_hits_and_misses(square):
+    assert square(3) == 9
+    assert square(3) == 9
+
+    assert square.calls == [3]
+    stats = get_cache_stats()['namespaces']['squares']
+    assert stats == {'hits': 1, 'misses': 1}
+
+
+def test_invalidate_single_key_and_namespace(square):
+    square(2)
+    square(3)
+
+    invalidate('squares', 2)
+    square(2)
+    square(3)
+    assert square.calls == [2, 3, 2]
+
+    invalidate('squares')
+    square(3)
+    assert square.calls == [2, 3, 2, 3]
+
+
+def test_shared_backend_is_used_across_local_caches(square):
+    redis = FakeRedis()
+    configure_cache(SharedCacheBackend(redis))
+    square(4)
+
+    # A new process starts with an empty local cache but finds the shared entry
+    configure_cache(SharedCacheBackend(redis))
+    assert square(4) == 16
+    assert square.calls == [4]
+
+    invalidate('squares')
+    assert redis.data == {}
+
+
+def test_cached_batch_only_looks_up_unseen_keys():
+    configure_cache()
+    calls = []
+
+    @cached_batch('doubles')
+    def doubles(numbers):
+        calls.append(numbers)
+        # Odd numbers have no value, like players without a season
+        return {number: number * 2 for number in numbers if number % 2 == 0}
+
+    assert doubles([2, 4]) == {2: 4, 4: 8}
+    assert doubles([4, 6, 7]) == {4: 8, 6: 12}
+    assert calls == [[2, 4], [6, 7]]
+
+    invalidate('doubles', 4)
+    doubles([2, 4])
+    assert calls[-1] == [4]
+    configure_cache()
@@ -0,0 +1,18 @@
+import numpy as np
+
+from service.derived_stats import calculate_atr, calculate_ppg, ratio_array, to_nullable_list
+
+
+def test_undefined_ratios_are_none():
+    assert calculate_atr(20, 10) == 2
+    assert calculate_atr(20, 0) is None
+    assert calculate_atr(20, None) is None
+    assert calculate_atr(None, 10) is None
+    assert calculate_ppg(100, 0) is None
+
+
+def test_array_ratios_match_scalar_semantics():
+    numerators = [20, 20, 20, np.nan]
+    denominators = [10, 0, np.nan, 10]
+
+    assert to_nullable_list(ratio_array(numerators, denominators)) == [2.0, None, None, None]
@@ -0,0 +1,75 @@
+import pytest
+from flask import Flask
+
+from repository.query_instrumentation import collect_queries
+from service.cache import configure_cache
+from service.request_memo import get_request_memo_stats, get_memo_stats, reset_memo_stats
+from service.team_service import get_team_details, update_team_players
+
+
+@pytest.fixture(scope='module')
+def players(seeded_team):
+    # The service cache is off, so every miss of the memo reaches the database
+    configure_cache(max_size=0)
+    yield seeded_team.player_ids
+    configure_cache()
+
+
+@pytest.fixture(scope='module')
+def team_id(players, seeded_team):
+    return seeded_team.team_id
+
+
+@pytest.fixture
+def app():
+    reset_memo_stats()
+    return Flask(__name__)
+
+
+def test_repeated_lookup_is_free(app, team_id):
+    with app.test_request_context(), collect_queries() as collector:
+        first = get_team_details(team_id)
+        queries = collector.count
+        assert get_team_details(team_id) is first
+        assert collector.count == queries
+
+        assert get_request_memo_stats() == {'hits': 1, 'misses': 1, 'saved_queries': queries}
+    assert get_memo_stats()['saved_queries'] == queries
+
+
+def test_memo_is_per_request(app, team_id):
+    with app.test_request_context():
+        get_team_details(team_id)
+    with app.test_request_context():
+        get_team_details(team_id)
+        assert get_request_memo_stats()['hits'] == 0
+
+
+def test_memo_is_per_request_inside_an_app_context(app, team_id):
+    """Requests pushed inside an active app context share its `g`, but not the memo"""
+    with app.app_context():
+        with app.test_request_context():
+            get_team_details(team_id)
+        with app.test_request_context():
+            get_team_details(team_id)
+            assert get_request_memo_stats() == {'hits': 0, 'misses': 1, 'saved_queries': 0}
+        # Nor does anything outside a request use it
+        with collect_queries() as collector:
+            get_team_details(team_id)
+        assert collector.count > 0
+    assert get_memo_stats()['hits'] == 0
+
+
+def test_write_clears_memo(app, team_id, players):
+    with app.test_request_context():
+        assert get_team_details(team_id)['team_name'] == 'Seeded Team'
+        update_team_players(team_id, players, 'Seeded Team Renamed')
+        assert get_team_details(team_id)['team_name'] == 'Seeded Team Renamed'
+
+
+def test_no_memo_outside_a_request(team_id):
+    with collect_queries() as collector:
+        get_team_details(team_id)
+        queries = collector.count
+        get_team_details(team_id)
+    assert collector.count == 2 * queries
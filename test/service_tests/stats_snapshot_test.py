@@ -0,0 +1,97 @@
+import psycopg2
+import pytest
+
+from models.playerSeason import PlayerSeason
+from repository.aggregate_repository import refresh_all_aggregates
+from repository.player_repository import insert_players_bulk
+from repository.player_season_repository import insert_player_seasons_bulk
+from service.cache import configure_cache
+from service.player_season_service import main_calc
+from service.stats_snapshot import load_snapshot, clear_snapshot, get_snapshot
+from service.team_service import get_team_details, get_teams_comparison_details, get_team_stats_by_name
+from test.conftest import SEEDED_POSITIONS
+
+
+@pytest.fixture(scope='module')
+def team_ids(seeded_team):
+    configure_cache()
+    # Earlier seasons with the cases the aggregation must treat like SQL: a NULL percentage,
+    # no turnovers, and a player without games who is not in the team
+    player_ids = seeded_team.player_ids + list(insert_players_bulk(['Snapshot bench']).values())
+    seasons = []
+    for i, (player_id, position) in enumerate(zip(player_ids, SEEDED_POSITIONS + ['C'])):
+        for season in (2022, 2023):
+            seasons.append(PlayerSeason(
+                player_id=player_id, position=position, season=season, team='LAL' if i % 2 else 'BOS',
+                points=100 * (i + 1) + season % 10, games=0 if i == 5 else 10 + i,
+                twoPercent=None if season == 2022 else 0.5, threePercent=0.25, ATR=1.0, PPG_ratio=1.0,
+                assists=20.0, turnovers=0.0 if i == 4 else 8.0
+            ))
+    insert_player_seasons_bulk(seasons)
+    refresh_all_aggregates()
+    yield [seeded_team.team_id]
+    clear_snapshot()
+    configure_cache()
+
+
+def both_paths(read):
+    # The same read against the database, then against a freshly loaded snapshot
+    clear_snapshot()
+    from_database = read()
+    assert load_snapshot() is not None
+    try:
+        return from_database, read()
+    finally:
+        clear_snapshot()
+
+
+def test_player_stats_match_database(team_ids):
+    for position, seasons, team in [('PG', None, None), ('C', [2023], None), ('SG', None, 'LAL'), ('XX', None, None)]:
+        from_database, from_snapshot = both_paths(lambda: main_calc.uncached(position, seasons, team))
+        assert from_snapshot == from_database
+
+
+def test_team_reads_match_database(team_ids):
+    for read in (lambda: get_team_details.uncached(team_ids[0]),
+                 lambda: get_teams_comparison_details(team_ids + [999999]),
+                 lambda: get_team_stats_by_name.uncached('LAL'),
+                 lambda: get_team_stats_by_name.uncached('Unknown')):
+        from_database, from_snapshot = both_paths(read)
+        if isinstance(from_database, dict) and 'players' in from_database:
+            key = lambda player: player['playerName']
+            from_database['players'].sort(key=key)
+            from_snapshot['players'].sort(key=key)
+        assert from_snapshot == from_database
+
+
+def test_snapshot_dictionary_encodes_text_columns(team_ids):
+    snapshot = load_snapshot()
+    clear_snapshot()
+
+    assert sorted(snapshot.positions) == ['C', 'PF', 'PG', 'SF', 'SG']
+    assert sorted(snapshot.teams) == ['BOS', 'LAL']
+    assert snapshot.position_codes.dtype.itemsize == 4
+    assert get_snapshot() is None
+
+
+def test_career_totals_group_by_player(team_ids):
+    """The grouped career sums agree with totals over each player's own rows"""
+    snapshot = load_snapshot()
+    clear_snapshot()
+
+    player_ids = sorted(set(snapshot.player_id.tolist()))
+    totals = snapshot.career_totals(player_ids + [999999])
+    assert sorted(totals) == player_ids
+    for player_id in player_ids:
+        assert totals[player_id] == snapshot._totals(snapshot.player_id == player_id)
+    assert snapshot.career_totals([]) == {}
+
+
+def test_failed_load_is_logged(monkeypatch, caplog):
+    def unavailable():
+        raise psycopg2.OperationalError("database unavailable")
+    monkeypatch.setattr('service.stats_snapshot.get_all_player_seasons', unavailable)
+
+    assert load_snapshot() is None
+    assert "Stats snapshot not loaded" in caplog.text
+    assert "database unavailable" in caplog.text
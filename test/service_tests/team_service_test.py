@@ -0,0 +1,40 @@
+import pytest
+
+from models.playerSeason import PlayerSeason
+from models.teamPlayer import TeamPlayer
+from repository.aggregate_repository import refresh_all_aggregates
+from repository.database import create_tables, drop_all_tables
+from repository.player_repository import insert_players_bulk
+from repository.player_season_repository import insert_player_seasons_bulk
+from repository.team_repository import create_new_team
+from service.team_service import compare_teams_with_missing
+
+
+@pytest.fixture(scope='module')
+def teams():
+    create_tables()
+    player_ids = insert_players_bulk(['Compare One', 'Compare Two', 'Compare Three'])
+    insert_player_seasons_bulk([
+        PlayerSeason(player_id=player_id, position="C", season=2024, team="NYK", points=points, games=10,
+                     twoPercent=0.5, threePercent=0.3, ATR=1.0, PPG_ratio=1.0, assists=20, turnovers=10)
+        for player_id, points in zip(player_ids.values(), [100, 300, 200])
+    ])
+    team_ids = [
+        create_new_team(f'Compare Team {i}', [TeamPlayer(player_id, name, 'C')])[0]
+        for i, (name, player_id) in enumerate(player_ids.items())
+    ]
+    refresh_all_aggregates()
+    yield team_ids
+    drop_all_tables()
+
+
+def test_compare_teams_sorted_by_ppg_ratio(teams):
+    comparison, missing = compare_teams_with_missing(teams)
+    assert missing == []
+    assert [team['points'] for team in comparison] == [300, 200, 100]
+
+
+def test_compare_teams_reports_missing_ids(teams):
+    comparison, missing = compare_teams_with_missing([teams[0], 999999])
+    assert missing == [999999]
+    assert [team['team_id'] for team in comparison] == [teams[0]]
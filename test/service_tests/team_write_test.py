@@ -0,0 +1,105 @@
+import pytest
+
+from models.playerSeason import PlayerSeason
+from repository.database import create_tables, drop_all_tables, db_connection
+from repository.player_repository import insert_players_bulk
+from repository.player_season_repository import insert_player_seasons_bulk
+from repository.aggregate_repository import refresh_all_aggregates
+from service.cache import configure_cache
+from service.team_service import main_create_team, update_team_players, get_team_details, TeamNotFoundError
+
+POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C', 'C']
+
+
+@pytest.fixture(scope='module')
+def player_ids():
+    configure_cache()
+    create_tables()
+    players = insert_players_bulk([f'Writer {i}' for i in range(len(POSITIONS))])
+    seasons = []
+    for player_id, position in zip(players.values(), POSITIONS):
+        # An older season at another position, so only the latest one must be used
+        seasons.append(PlayerSeason(player_id=player_id, position='PG', season=2023, team='BOS', points=50,
+                                    games=5, twoPercent=0.5, threePercent=0.3, ATR=1.0, PPG_ratio=1.0,
+                                    assists=10, turnovers=5))
+        seasons.append(PlayerSeason(player_id=player_id, position=position, season=2024, team='BOS', points=100,
+                                    games=10, twoPercent=0.5, threePercent=0.3, ATR=1.0, PPG_ratio=1.0,
+                                    assists=20, turnovers=10))
+    insert_player_seasons_bulk(seasons)
+    refresh_all_aggregates()
+    yield list(players.values())
+    drop_all_tables()
+
+
+@pytest.fixture(autouse=True)
+def clear_teams():
+    yield
+    with db_connection() as cursor:
+        cursor.execute('DELETE FROM teams')
+
+
+def team_members(team_id):
+    with db_connection() as cursor:
+        cursor.execute('''
+            SELECT player_id, player_position FROM team_players WHERE team_id = %s ORDER BY player_id
+        ''', (team_id,))
+        return {row['player_id']: row['player_position'] for row in cursor.fetchall()}
+
+
+def test_create_team_uses_last_season_positions(player_ids):
+    team_id = main_create_team('Write Team', player_ids[:5])
+
+    assert team_members(team_id) == dict(zip(player_ids[:5], POSITIONS[:5]))
+    assert sum(player['points'] for player in get_team_details(team_id)['players']) == 750
+    # Same name again
+    assert main_create_team('Write Team', player_ids[:5]) is None
+
+
+def test_create_team_missing_position(player_ids):
+    with pytest.raises(ValueError, match="Missing players for positions: PF"):
+        main_create_team('No Forward', player_ids[:3] + player_ids[4:])
+
+
+def test_create_team_unknown_player(player_ids):
+    with pytest.raises(ValueError, match="Player with ID 999999 not found"):
+        main_create_team('Ghost Team', player_ids[:4] + [999999])
+
+
+def test_update_team_replaces_players(player_ids):
+    team_id = main_create_team('Update Team', player_ids[:5])
+    new_roster = player_ids[:4] + [player_ids[5]]
+
+    update_team_players(team_id, new_roster, 'Update Team Renamed')
+
+    assert team_members(team_id) == dict(zip(new_roster, POSITIONS[:5]))
+    assert get_team_details(team_id)['team_name'] == 'Update Team Renamed'
+
+
+def test_update_team_rejects_players_of_other_teams(player_ids):
+    first = main_create_team('Roster A', player_ids[:5])
+    second = main_create_team('Roster B', player_ids[:4] + [player_ids[5]])
+
+    with pytest.raises(ValueError, match=f"Team ID: {first}"):
+        update_team_players(second, player_ids[:5])
+
+
+def test_update_missing_team(player_ids):
+    with pytest.raises(TeamNotFoundError):
+        update_team_players(999999, player_ids[:5])
+
+
+def test_writes_follow_the_latest_season_projection(player_ids):
+    """Positions come from player_latest_season as it is when the team is written"""
+    roster = player_ids[:5]
+
+    swap = 'UPDATE player_latest_season SET position = %s WHERE player_id = %s'
+    with db_connection() as cursor:
+        cursor.execute(swap, ('C', roster[3]))
+        cursor.execute(swap, ('PF', roster[4]))
+    try:
+        team_id = main_create_team('Fresh Positions', roster)
+        assert team_members(team_id) == dict(zip(roster, ['PG', 'SG', 'SF', 'C', 'PF']))
+    finally:
+        with db_connection() as cursor:
+            cursor.execute(swap, ('PF', roster[3]))
+            cursor.execute(swap, ('C', roster[4]))
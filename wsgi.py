@@ -0,0 +1,8 @@
+# Production entry point, e.g. `gunicorn -c gunicorn.conf.py wsgi:app`
+from config.app_config import WARM_UP_ENABLED
+from main import create_app, warm_up
+
+app = create_app()
+
+if WARM_UP_ENABLED:
+    warm_up(app)